@@ -1,77 +1,42 @@
-import pandas as pd
-import genanki
-import random
+import argparse
+import hashlib
+import json
 import os
-from gtts import gTTS
-from utils import clean_word_for_tts, DEFAULT_CSV_PATH
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from utils import DEFAULT_CSV_PATH, file_sha1
+from word_loader import load_word_records, EmptyWordListError
+from tts_engine import synthesize_all, get_backend, BACKENDS, DEFAULT_MAX_WORKERS
+from audio_cache import AudioCache, DEFAULT_CACHE_DIR
+import instrumentation
 
 # --- 配置 --- #
 CSV_FILE_PATH = DEFAULT_CSV_PATH  # 你的CSV文件路径
 ANKI_DECK_NAME = "拼写练习：四上英语单词" # Anki牌组的名称
 ANKI_OUTPUT_FILE = "拼写练习_四上英语单词.apkg" # 输出的Anki文件名称
-MEDIA_DIR = "media_files" # 存放音频文件的文件夹
+MEDIA_DIR = DEFAULT_CACHE_DIR # 存放音频文件的文件夹（与 word_typer 共用的发音缓存）
+TTS_BACKEND = "gtts" # 发音后端：gtts（Google TTS）或 fake（本地假合成，用于压测）
+TTS_MAX_WORKERS = DEFAULT_MAX_WORKERS # 同时生成发音的最大并发数
+MODEL_NAME = 'Typing-English-Word-Model' # Anki模型名称（模型ID由它派生）
+MANIFEST_SUFFIX = ".manifest.json" # 构建清单：记录上次构建的输入，用于增量重建
+MANIFEST_VERSION = 1
+BATCH_JOBS = os.cpu_count() or 1 # 批量模式下读取CSV、打包牌组的进程数
 
-# --- 辅助函数 --- #
-
-def generate_audio(word, audio_path):
-    """生成单词的MP3发音文件。"""
-    cleaned_word = clean_word_for_tts(word)
-    if not cleaned_word: # 如果清理后单词为空，则不生成发音
-        return False
-
-    if not os.path.exists(MEDIA_DIR):
-        os.makedirs(MEDIA_DIR)
-
-    try:
-        print(f"正在生成 '{cleaned_word}' 的发音...")
-        tts = gTTS(text=cleaned_word, lang='en', slow=False)
-        tts.save(audio_path)
-        return True
-    except Exception as e:
-        print(f"生成 '{cleaned_word}' 的发音失败：{e}。请检查网络连接。")
-        return False
-
-# --- 主程序 --- #
-def main():
-    print("\n--- 正在准备生成 Anki 闪卡 ---")
-    
-    # 确保媒体文件夹存在
-    if not os.path.exists(MEDIA_DIR):
-        os.makedirs(MEDIA_DIR)
-
-    # 读取CSV文件
-    try:
-        df = pd.read_csv(CSV_FILE_PATH)
-        print(f"成功读取文件：{CSV_FILE_PATH}")
-    except FileNotFoundError:
-        print(f"错误：CSV文件未找到，请确保文件名为 '{CSV_FILE_PATH}' 且在脚本同目录下。")
-        return
-    except pd.errors.EmptyDataError:
-        print(f"错误：CSV文件 '{CSV_FILE_PATH}' 是空的。")
-        return
-    except Exception as e:
-        print(f"读取CSV文件时发生错误：{e}")
-        return
-
-    # 创建Anki模型
-    # 字段：Word (英文单词), Meaning (中文释义), Audio (音频文件标签)
-    # 模板：Typing Card (拼写练习卡片)
-    model = genanki.Model(
-        random.randrange(1 << 30, 1 << 31), # 随机生成Model ID
-        'Typing-English-Word-Model',
-        fields=[
-            {'name': 'Word'},
-            {'name': 'Meaning'},
-            {'name': 'Audio'}, # 新增音频字段
-        ],
-        templates=[
-            {
-                'name': 'Typing Card',
-                'qfmt': '{{Audio}}<br><br><span style="color: gray;">中文释义：{{Meaning}}</span><br><br>{{type:Word}}',
-                'afmt': '{{FrontSide}}<hr id="answer">你输入的是：{{type:Word}}<br>正确拼写是：<b>{{Word}}</b>',
-            },
-        ],
-        css="""
+# 字段：Word (英文单词), Meaning (中文释义), Audio (音频文件标签)
+# 模板：Typing Card (拼写练习卡片)
+MODEL_FIELDS = [
+    {'name': 'Word'},
+    {'name': 'Meaning'},
+    {'name': 'Audio'}, # 新增音频字段
+]
+MODEL_TEMPLATES = [
+    {
+        'name': 'Typing Card',
+        'qfmt': '{{Audio}}<br><br><span style="color: gray;">中文释义：{{Meaning}}</span><br><br>{{type:Word}}',
+        'afmt': '{{FrontSide}}<hr id="answer">你输入的是：{{type:Word}}<br>正确拼写是：<b>{{Word}}</b>',
+    },
+]
+MODEL_CSS = """
         .card {
           font-family: arial;
           font-size: 22px;
@@ -90,63 +55,341 @@ def main():
         .card .jp-audio { /* Anki音频播放器样式 */
             margin-top: 10px;
         }
-        """,
-    )
+        """
+
+# --- 辅助函数 --- #
+
+def stable_id(name):
+    """由名称派生固定的 Anki ID（与 genanki 推荐的随机范围 [2^30, 2^31) 相同），每次构建都一样。"""
+    digest = hashlib.sha1(name.encode('utf-8')).digest()
+    return (1 << 30) + int.from_bytes(digest[:4], 'big') % (1 << 30)
+
+def note_fingerprint(cleaned_word, meaning):
+    """一张卡片内容的指纹，用于判断这一行是否改动过。"""
+    return hashlib.sha1(f"{cleaned_word}\0{meaning}".encode('utf-8')).hexdigest()
+
+def manifest_path_for(output_file):
+    return f"{output_file}{MANIFEST_SUFFIX}"
 
-    # 创建Anki牌组
-    deck = genanki.Deck(
-        random.randrange(1 << 30, 1 << 31), # 随机生成Deck ID
-        ANKI_DECK_NAME
+def load_manifest(path):
+    """读取上次的构建清单；不存在或已损坏时返回空字典。"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get("version") == MANIFEST_VERSION else {}
+
+def save_manifest(path, manifest):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
+
+def create_model(genanki):
+    """创建 Anki 模型（模型ID固定，重复导入时不会产生新的笔记类型）。"""
+    return genanki.Model(
+        stable_id(MODEL_NAME),
+        MODEL_NAME,
+        fields=MODEL_FIELDS,
+        templates=MODEL_TEMPLATES,
+        css=MODEL_CSS,
     )
 
-    # 存储媒体文件路径，用于genanki.Package
-    media_files_list = []
+def build_settings(deck_names, backend):
+    """构建设置：任何一项变化都需要完整重建。"""
+    return {
+        "deck_names": list(deck_names),
+        "deck_ids": [stable_id(name) for name in deck_names],
+        "model_id": stable_id(MODEL_NAME),
+        "tts": [backend.name, backend.lang, bool(backend.slow)],
+    }
 
-    # 遍历CSV数据，添加卡片
-    for index, row in df.iterrows():
-        word_raw = str(row['Word']).strip() # 原始英文单词，可能带音标
-        meaning = str(row['Meaning']).strip() # 中文释义
+def collect_entries(genanki, records, deck_name):
+    """
+    为每个单词生成固定的笔记GUID并按GUID去重。
+    GUID 由 (牌组名, 清理后的单词) 派生，单个牌组和批量模式用同一种方式：
+    同一个单词出现在不同单元里不会互相覆盖，同一个单元拆分打包或合并打包时 GUID 也相同。
 
-        # 过滤掉CSV中的标题行（如果它们被错误地当作数据行）
-        if word_raw.lower() == 'word' or meaning.lower() == 'meaning':
-            continue
-        if word_raw.lower() == '英\u200b文' or meaning.lower() == '中\u200b文': # 过滤你提供的示例中的特殊标题
+    Returns:
+        list: [(guid, 清理后的单词, 中文释义, 内容指纹)]
+    """
+    entries = []
+    seen = set()
+    for record in records:
+        guid = genanki.guid_for(deck_name, record.clean)
+        if guid in seen:
+            print(f"警告：单词 '{record.clean}' 重复出现，只保留第一条。")
             continue
+        seen.add(guid)
+        entries.append((guid, record.clean, record.chinese, note_fingerprint(record.clean, record.chinese)))
+    return entries
 
-        # 清理单词，用于发音和比较
-        english_word_clean = clean_word_for_tts(word_raw)
+def diff_entries(entries, previous):
+    """与上次的构建清单比较，打印新增/修改/删除/未变的条数。"""
+    changed_words = [word for guid, word, _, fp in entries if previous.get(guid) != fp]
+    current = {guid for guid, _, _, _ in entries}
+    added = sum(1 for guid in current if guid not in previous)
+    removed = sum(1 for guid in previous if guid not in current)
+    print(f"与上次构建相比：新增 {added} 条，修改 {len(changed_words) - added} 条，"
+          f"删除 {removed} 条，未变 {len(entries) - len(changed_words)} 条。")
 
-        if not english_word_clean or not meaning: # 跳过空单词或空释义
-            print(f"警告：跳过空单词或空释义的行：Word='{word_raw}', Meaning='{meaning}'")
-            continue
+def resolve_audio(words, cache, backend, max_workers):
+    """
+    已在缓存里的单词直接复用，只为缓存中没有（新增、单词被修改或音频已被淘汰）的单词生成。
+    音频只由 (单词, 语言, 语速) 决定：只改了释义的行单词没变，原来的音频仍然适用，不需要重新合成；
+    需要全部重新合成时删除缓存目录即可。
+    """
+    # 缓存查询和 TTS 调用次数由 synthesize_all 统计（tts.cache_hits / tts.requests）
+    with instrumentation.span("anki.tts"):
+        return synthesize_all(words, cache, backend=backend, max_workers=max_workers)
+
+def write_package(genanki, output_file, decks, audio_paths):
+    """
+    把一个或多个牌组写入同一个 .apkg。
 
-        # 生成音频文件路径
-        audio_filename = f"{english_word_clean.lower().replace(' ', '_')}.mp3"
-        audio_full_path = os.path.join(MEDIA_DIR, audio_filename)
-        audio_tag = f"[sound:{audio_filename}]"
+    Args:
+        decks (list): [(牌组名, entries)]，牌组名含 "::" 时在 Anki 中显示为子牌组。
+        audio_paths (dict): 单词 -> 音频文件路径（生成失败为 None）。
+    """
+    model = create_model(genanki)
 
-        # 生成音频（如果不存在）
-        if not os.path.exists(audio_full_path):
-            if generate_audio(english_word_clean, audio_full_path):
+    # 存储媒体文件路径，用于genanki.Package
+    media_files_list = []
+    seen_media = set()
+    anki_decks = []
+    for deck_name, entries in decks:
+        deck = genanki.Deck(stable_id(deck_name), deck_name)
+        for guid, english_word_clean, meaning, _ in entries:
+            audio_full_path = audio_paths.get(english_word_clean)
+            audio_tag = f"[sound:{os.path.basename(audio_full_path)}]" if audio_full_path else ""
+            if audio_full_path and audio_full_path not in seen_media:
+                seen_media.add(audio_full_path)
                 media_files_list.append(audio_full_path)
-        else:
-            media_files_list.append(audio_full_path) # 如果已存在，也加入列表，确保打包
 
-        # 创建Anki Note
-        note = genanki.Note(
-            model=model,
-            fields=[english_word_clean, meaning, audio_tag] # 传递清理后的单词、释义和音频标签
-        )
-        deck.add_note(note)
+            # 创建Anki Note（固定GUID：重新导入时更新已有卡片而不是重复添加）
+            note = genanki.Note(
+                model=model,
+                fields=[english_word_clean, meaning, audio_tag], # 传递清理后的单词、释义和音频标签
+                guid=guid,
+            )
+            deck.add_note(note)
+        anki_decks.append(deck)
+    instrumentation.count("anki.notes", sum(len(entries) for _, entries in decks))
+    instrumentation.count("anki.media_files", len(media_files_list))
+    with instrumentation.span("anki.write_apkg"):
+        genanki.Package(anki_decks, media_files=media_files_list).write_to_file(output_file)
+
+def save_build_manifest(output_file, csv_sha1, settings, entries, audio_paths):
+    # 音频生成失败的行不记入清单，下次构建会重试
+    built = {guid: fp for guid, word, _, fp in entries if audio_paths.get(word)}
+    save_manifest(manifest_path_for(output_file), {
+        "version": MANIFEST_VERSION,
+        "csv_sha1": csv_sha1 if len(built) == len(entries) else None,
+        "settings": settings,
+        "notes": built,
+    })
+
+def previous_notes(manifest, settings):
+    return manifest.get("notes", {}) if manifest.get("settings") == settings else {}
+
+def is_up_to_date(manifest, csv_sha1, settings, output_file):
+    return (manifest.get("csv_sha1") == csv_sha1 and manifest.get("settings") == settings
+            and os.path.exists(output_file))
+
+# --- 主程序 --- #
+@instrumentation.instrumented("anki")
+def main(tts_backend=None, max_workers=TTS_MAX_WORKERS, force=False):
+    import genanki  # 延迟导入：--help 等场景不需要加载
+    print("\n--- 正在准备生成 Anki 闪卡 ---")
+
+    backend = tts_backend or get_backend(TTS_BACKEND)
+    settings = build_settings([ANKI_DECK_NAME], backend)
 
-    # 导出Anki牌组
+    # 读取CSV文件
     try:
-        genanki.Package(deck, media_files=media_files_list).write_to_file(ANKI_OUTPUT_FILE)
+        csv_sha1 = file_sha1(CSV_FILE_PATH)
+        manifest = {} if force else load_manifest(manifest_path_for(ANKI_OUTPUT_FILE))
+        if is_up_to_date(manifest, csv_sha1, settings, ANKI_OUTPUT_FILE):
+            print(f"单词表未变化，跳过重建：{ANKI_OUTPUT_FILE}（如需强制重建请加 --force）")
+            return
+        with instrumentation.span("anki.load_csv"):
+            records = load_word_records(CSV_FILE_PATH)
+        print(f"成功读取文件：{CSV_FILE_PATH}（有效单词 {len(records)} 个）")
+    except FileNotFoundError:
+        print(f"错误：CSV文件未找到，请确保文件名为 '{CSV_FILE_PATH}' 且在脚本同目录下。")
+        return
+    except EmptyWordListError:
+        print(f"错误：CSV文件 '{CSV_FILE_PATH}' 是空的。")
+        return
+    except Exception as e:
+        print(f"读取CSV文件时发生错误：{e}")
+        return
+
+    # 打开共享发音缓存（会自动创建文件夹）
+    cache = AudioCache(MEDIA_DIR)
+
+    # 第一遍：按清理后的单词生成固定的笔记GUID，并与上次的构建清单比较
+    with instrumentation.span("anki.collect_entries"):
+        entries = collect_entries(genanki, records, ANKI_DECK_NAME)
+        diff_entries(entries, previous_notes(manifest, settings))
+
+    # 第二遍：只为缓存中还没有发音的单词生成音频（先去重，再并发生成）
+    audio_paths = resolve_audio((word for _, word, _, _ in entries), cache, backend, max_workers)
+
+    # 第三遍：添加卡片并导出Anki牌组（牌组ID由名称派生，重复构建时保持不变）
+    try:
+        write_package(genanki, ANKI_OUTPUT_FILE, [(ANKI_DECK_NAME, entries)], audio_paths)
+        save_build_manifest(ANKI_OUTPUT_FILE, csv_sha1, settings, entries, audio_paths)
         print(f"\n导出成功！已生成：{ANKI_OUTPUT_FILE}")
         print(f"音频文件保存在：{MEDIA_DIR} 文件夹中。")
         print("请将生成的 .apkg 文件导入到 Anki 中使用。")
     except Exception as e:
         print(f"导出Anki文件失败：{e}")
 
+# --- 批量模式 --- #
+
+def _load_unit(csv_path):
+    """（子进程）读取并清理一个单元词表，返回 (records, 错误信息)。"""
+    try:
+        return load_word_records(csv_path, verbose=False), None
+    except Exception as e:
+        return [], str(e) or type(e).__name__
+
+def _write_unit_package(output_file, deck_name, entries, audio_paths):
+    """（子进程）把一个单元写成独立的 .apkg。"""
+    import genanki
+    write_package(genanki, output_file, [(deck_name, entries)], audio_paths)
+    return output_file
+
+def default_batch_output(directory):
+    """合并模式的默认输出文件：单元目录旁边的 "<目录名>.apkg"。"""
+    folder = Path(directory).resolve()
+    return str(folder.with_name(f"{folder.name}.apkg"))
+
+@instrumentation.instrumented("anki-batch")
+def batch_main(directory, split=False, output=None, jobs=BATCH_JOBS,
+               tts_backend=None, max_workers=TTS_MAX_WORKERS, force=False):
+    """
+    批量模式：把目录下每个 CSV 作为一个单元，生成子牌组 "<ANKI_DECK_NAME>::<文件名>"。
+
+    Args:
+        directory (str): 单元 CSV 所在目录。
+        split (bool): False 时所有单元打包成一个 .apkg；True 时每个单元各自一个 .apkg。
+        output (str | None): 合并模式为输出文件（默认为目录旁边的 "<目录名>.apkg"，不会覆盖单个牌组的 ANKI_OUTPUT_FILE），
+            拆分模式为输出目录（默认与 CSV 同目录）。
+        jobs (int): 读取 CSV、打包牌组使用的进程数。
+    """
+    import genanki
+    print(f"\n--- 正在批量生成 Anki 闪卡：{directory} ---")
+
+    csv_files = sorted(Path(directory).glob("*.csv"))
+    if not csv_files:
+        print(f"错误：目录 {directory} 中没有 CSV 文件。")
+        return
+
+    backend = tts_backend or get_backend(TTS_BACKEND)
+    deck_names = [f"{ANKI_DECK_NAME}::{path.stem}" for path in csv_files]
+    csv_hashes = [file_sha1(path) for path in csv_files]
+
+    # 确定哪些输出需要重建（输入和设置都没变的直接跳过）
+    if split:
+        out_dir = Path(output) if output else None
+        if out_dir:
+            out_dir.mkdir(parents=True, exist_ok=True)
+        targets = []
+        for path, deck_name, csv_sha1 in zip(csv_files, deck_names, csv_hashes):
+            output_file = str((out_dir or path.parent) / f"{path.stem}.apkg")
+            settings = build_settings([deck_name], backend)
+            manifest = {} if force else load_manifest(manifest_path_for(output_file))
+            if is_up_to_date(manifest, csv_sha1, settings, output_file):
+                print(f"未变化，跳过：{output_file}")
+                continue
+            targets.append((output_file, [path], [deck_name], csv_sha1, settings, manifest))
+    else:
+        output_file = output or default_batch_output(directory)
+        csv_sha1 = hashlib.sha1("".join(csv_hashes).encode('ascii')).hexdigest()
+        settings = build_settings(deck_names, backend)
+        manifest = {} if force else load_manifest(manifest_path_for(output_file))
+        if is_up_to_date(manifest, csv_sha1, settings, output_file):
+            print(f"所有单元都未变化，跳过重建：{output_file}（如需强制重建请加 --force）")
+            return
+        targets = [(output_file, csv_files, deck_names, csv_sha1, settings, manifest)]
+    if not targets:
+        print("所有单元都未变化，无需重建。")
+        return
+
+    # 1. 多进程读取并清理需要重建的单元
+    paths = [path for target in targets for path in target[1]]
+    with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(paths)))) as pool:
+        loaded = dict(zip(paths, pool.map(_load_unit, paths)))
+    for path, (records, error) in loaded.items():
+        if error:
+            print(f"警告：读取 {path.name} 失败，已跳过：{error}")
+        else:
+            print(f"已读取 {path.name}：有效单词 {len(records)} 个")
+
+    # 2. 生成笔记，并汇总所有单元的单词：多个单元共有的单词只合成一次
+    plans = []
+    all_words = []
+    for output_file, unit_paths, unit_decks, csv_sha1, settings, manifest in targets:
+        decks = []
+        for path, deck_name in zip(unit_paths, unit_decks):
+            entries = collect_entries(genanki, loaded[path][0], deck_name)
+            decks.append((deck_name, entries))
+        all_entries = [entry for _, entries in decks for entry in entries]
+        if any(loaded[path][1] for path in unit_paths):
+            csv_sha1 = None  # 有单元读取失败：不记录为已完成，下次重试
+        print(f"{output_file}：", end="")
+        diff_entries(all_entries, previous_notes(manifest, settings))
+        all_words += [word for _, word, _, _ in all_entries]
+        plans.append((output_file, decks, all_entries, csv_sha1, settings))
+
+    cache = AudioCache(MEDIA_DIR)
+    audio_paths = resolve_audio(all_words, cache, backend, max_workers)
+
+    # 3. 打包：拆分模式下每个单元一个进程
+    try:
+        if split:
+            with ProcessPoolExecutor(max_workers=max(1, min(jobs, len(plans)))) as pool:
+                futures = []
+                for output_file, decks, all_entries, _, _ in plans:
+                    (deck_name, entries), = decks
+                    unit_audio = {word: audio_paths.get(word) for _, word, _, _ in entries}
+                    futures.append(pool.submit(_write_unit_package, output_file, deck_name, entries, unit_audio))
+                for future in futures:
+                    future.result()
+        else:
+            output_file, decks, _, _, _ = plans[0]
+            write_package(genanki, output_file, decks, audio_paths)
+    except Exception as e:
+        print(f"导出Anki文件失败：{e}")
+        return
+
+    for output_file, _, all_entries, csv_sha1, settings in plans:
+        save_build_manifest(output_file, csv_sha1, settings, all_entries, audio_paths)
+        print(f"导出成功！已生成：{output_file}")
+    print(f"音频文件保存在：{MEDIA_DIR} 文件夹中。")
+    print("请将生成的 .apkg 文件导入到 Anki 中使用。")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="将 CSV 单词表转换为带发音的 Anki 牌组 (.apkg)")
+    parser.add_argument("--tts", choices=sorted(BACKENDS), default=TTS_BACKEND,
+                        help=f"发音后端（默认 {TTS_BACKEND}；fake 为本地假合成，不联网，用于压测）")
+    parser.add_argument("--workers", type=int, default=TTS_MAX_WORKERS,
+                        help=f"同时生成发音的最大并发数（默认 {TTS_MAX_WORKERS}）")
+    parser.add_argument("--force", action="store_true", help="忽略构建清单，强制完整重建")
+    parser.add_argument("--dir", help="批量模式：把目录下每个 CSV 作为一个子牌组")
+    parser.add_argument("--split", action="store_true", help="批量模式下每个 CSV 单独生成一个 .apkg")
+    parser.add_argument("--output", help="批量模式的输出文件（合并，默认为目录旁边的 <目录名>.apkg）或输出目录（--split）")
+    parser.add_argument("--jobs", type=int, default=BATCH_JOBS,
+                        help=f"批量模式下读取和打包使用的进程数（默认 {BATCH_JOBS}）")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    if args.dir:
+        batch_main(args.dir, split=args.split, output=args.output, jobs=args.jobs,
+                   tts_backend=get_backend(args.tts), max_workers=args.workers, force=args.force)
+    else:
+        main(tts_backend=get_backend(args.tts), max_workers=args.workers, force=args.force)
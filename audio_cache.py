@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+"""
+共享的单词发音缓存（word_typer 与 anki_generator 共用）
+- 以 (清理后的单词, 语言, 语速) 的哈希作为文件名，不同单词不会再互相覆盖
+- 磁盘索引 index.json 记录每个文件的大小和最近使用时间，超出容量时按 LRU 淘汰
+- 先写临时文件再原子重命名，并用文件锁保护索引，多个进程可以同时读写同一个缓存
+- 写索引时（每个实例第一次，以及需要淘汰时）与磁盘上的文件对账：没进索引的发音（进程崩溃、后台任务在写索引之后才完成）补进索引一起计入容量，
+  文件已不在的条目删掉，崩溃留下的临时文件过期后清理
+- 命中或生成时刷新文件的修改时间；淘汰时在文件锁内重新检查，最近 PROTECT_SECONDS 秒内被任何进程用过的文件不删。
+  限制：其他进程拿到路径后超过这个时间才去读（期间没有再次 get），文件仍可能已被淘汰
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# --- 配置 --- #
+DEFAULT_CACHE_DIR = "audio_cache"             # 缓存目录
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024         # 缓存容量上限（字节），超出后淘汰最久未使用的发音
+INDEX_FILE = "index.json"
+LOCK_FILE = "index.lock"
+INDEX_VERSION = 1
+FLUSH_EVERY = 64                              # 每新增多少个文件自动写一次索引
+PROTECT_SECONDS = 3600                        # 最近这么多秒内被用过（任何进程）的发音不会被淘汰
+STALE_TMP_SECONDS = 3600                      # 超过这么多秒的临时文件视为崩溃残留，写索引时删除
+
+def cache_key(text, lang='en', slow=False):
+    """由 (文本, 语言, 语速) 计算缓存键。"""
+    payload = json.dumps([text, lang, bool(slow)], ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+class _InterProcessLock:
+    """跨进程 + 跨线程的互斥锁（基于锁文件）。"""
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fh = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        self._depth += 1
+        if self._depth == 1:
+            self._fh = open(self.path, 'a+b')
+            if fcntl is not None:
+                fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+            else:
+                while True:
+                    try:
+                        self._fh.seek(0)
+                        msvcrt.locking(self._fh.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            self._depth -= 1
+            if self._depth == 0:
+                if fcntl is not None:
+                    fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+                else:
+                    self._fh.seek(0)
+                    msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+                self._fh.close()
+                self._fh = None
+        finally:
+            self._thread_lock.release()
+
+
+def _touch(path):
+    """刷新文件的修改时间，让其他进程淘汰时知道它刚被用过。"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+class AudioCache:
+    """内容寻址的发音缓存。"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._index_path = os.path.join(cache_dir, INDEX_FILE)
+        self._lock = _InterProcessLock(os.path.join(cache_dir, LOCK_FILE))
+        self._mutex = threading.Lock()
+        self._new_entries = {}   # 本进程新增、尚未写入索引的条目
+        self._touched = {}       # 本进程命中过的键 -> 最近使用时间
+        self._protected = set()  # 本进程用到的键，淘汰时跳过（避免打包/播放途中被删）
+        self._reconciled = False # 本实例是否已与磁盘上的文件对过账
+
+    # --- 查询 --- #
+
+    def path_for(self, text, lang='en', slow=False):
+        """返回该发音在缓存中的路径（文件不一定存在）。"""
+        return os.path.join(self.cache_dir, f"{cache_key(text, lang, slow)}.mp3")
+
+    def get(self, text, lang='en', slow=False):
+        """命中则返回文件路径，否则返回 None。"""
+        if not text:
+            return None
+        key = cache_key(text, lang, slow)
+        path = os.path.join(self.cache_dir, f"{key}.mp3")
+        if not os.path.exists(path):
+            return None
+        _touch(path)
+        with self._mutex:
+            self._touched[key] = time.time()
+            self._protected.add(key)
+        return path
+
+    # --- 写入 --- #
+
+    def store(self, text, backend):
+        """用发音后端生成音频并原子地写入缓存，返回文件路径。"""
+        lang, slow = backend.lang, backend.slow
+        key = cache_key(text, lang, slow)
+        path = os.path.join(self.cache_dir, f"{key}.mp3")
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{key}.", suffix=".tmp")
+        os.close(fd)
+        try:
+            backend.synthesize(text, tmp_path)
+            os.replace(tmp_path, path)  # 原子重命名：其他进程要么看不到，要么看到完整文件
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+        with self._mutex:
+            self._new_entries[key] = {
+                "text": text, "lang": lang, "slow": bool(slow),
+                "size": os.path.getsize(path), "atime": time.time(),
+            }
+            self._protected.add(key)
+            need_flush = len(self._new_entries) >= FLUSH_EVERY
+        if need_flush:
+            self.flush()
+        return path
+
+    def get_or_create(self, text, backend):
+        """命中缓存直接返回路径，否则生成后返回；文本为空时返回 None。"""
+        if not text:
+            return None
+        return self.get(text, backend.lang, backend.slow) or self.store(text, backend)
+
+    # --- 索引与淘汰 --- #
+
+    def _load_index(self):
+        """读取磁盘索引；缺失或损坏时返回空索引（随后由 _reconcile 按磁盘上的文件重建）。"""
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                return data.get("entries", {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _scan_files(self):
+        """返回磁盘上的发音文件 {键: stat}；顺便删除过期的临时文件（写入途中崩溃的残留）。"""
+        files = {}
+        now = time.time()
+        with os.scandir(self.cache_dir) as it:
+            for item in it:
+                key, ext = os.path.splitext(item.name)
+                try:
+                    if ext == ".mp3" and len(key) == 40:
+                        files[key] = item.stat()
+                    elif ext == ".tmp" and now - item.stat().st_mtime > STALE_TMP_SECONDS:
+                        os.remove(item.path)
+                except OSError:
+                    continue  # 扫描期间被其他进程删除或替换
+        return files
+
+    def _reconcile(self, entries):
+        """让索引与磁盘一致：补上没有索引的发音文件，删掉文件已不存在的条目。"""
+        files = self._scan_files()
+        for key in [key for key in entries if key not in files]:
+            del entries[key]
+        for key, st in files.items():
+            if key not in entries:
+                entries[key] = {"size": st.st_size, "atime": st.st_mtime}
+
+    def _save_index(self, entries):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".index.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": INDEX_VERSION, "entries": entries}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._index_path)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    @staticmethod
+    def _total_size(entries):
+        return sum(e.get("size", 0) for e in entries.values())
+
+    def _evict(self, entries):
+        """按最近使用时间从旧到新删除，直到总大小不超过上限（调用方需持有文件锁）。"""
+        total = self._total_size(entries)
+        if total <= self.max_bytes:
+            return 0
+        removed = 0
+        now = time.time()
+        for key, entry in sorted(entries.items(), key=lambda kv: kv[1].get("atime", 0)):
+            if total <= self.max_bytes:
+                break
+            if key in self._protected:
+                continue
+            path = os.path.join(self.cache_dir, f"{key}.mp3")
+            try:
+                # 在文件锁内重新检查：其他进程刚生成或刚用过（刷新了修改时间）的文件不删
+                if now - os.stat(path).st_mtime < PROTECT_SECONDS:
+                    continue
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= entry.get("size", 0)
+            del entries[key]
+            removed += 1
+        return removed
+
+    def flush(self):
+        """把本进程的新增与命中记录合并进磁盘索引，并按需淘汰。"""
+        with self._mutex:
+            new_entries, self._new_entries = self._new_entries, {}
+            touched, self._touched = self._touched, {}
+        if not new_entries and not touched:
+            return
+        with self._lock:
+            entries = self._load_index()
+            entries.update(new_entries)
+            # 全目录扫描较慢：只在本实例第一次写索引和需要淘汰时对账
+            if not self._reconciled or self._total_size(entries) > self.max_bytes:
+                self._reconcile(entries)
+                self._reconciled = True
+            for key, atime in touched.items():
+                if key in entries:
+                    entries[key]["atime"] = max(entries[key].get("atime", 0), atime)
+            self._evict(entries)
+            self._save_index(entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+单词清理微基准：对比旧版逐个 re.sub、带缓存的单词接口和批量 clean_words 接口
+用法：python benchmarks/bench_clean_words.py [--n 100000] [--unique 5000]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import clean_word_for_tts, clean_words, _clean_word_cached  # noqa: E402
+
+SAMPLE_WORDS = ["apple", "doctor", "factory worker", "PE", "busy", "playground", "a lot of", "nurse"]
+SAMPLE_PHONETICS = ["/ˈæpl/", "/ˈdɒktər/", "/ˈbɪzi/", "/ˌpiːˈiː/", "/nɜːs/"]
+
+def legacy_clean_word_for_tts(word_str):
+    """旧版实现（每次调用三次未预编译的 re.sub），作为对照组。"""
+    if not isinstance(word_str, str):
+        return ""
+    cleaned_word = re.sub(r'/.*?/', '', word_str)
+    cleaned_word = re.sub(r'\(.*\)', '', cleaned_word)
+    cleaned_word = re.sub(r'[^a-zA-Z0-9\s]', '', cleaned_word)
+    return cleaned_word.strip()
+
+def make_words(n, unique, seed=0):
+    """生成 n 个原始单词（含音标、括号、换行和空值），其中不同取值约 unique 个。"""
+    rng = random.Random(seed)
+    pool = []
+    for i in range(unique):
+        word = f"{rng.choice(SAMPLE_WORDS)}{i}"
+        kind = i % 5
+        if kind == 0:
+            word = f"{word}\n{rng.choice(SAMPLE_PHONETICS)}"
+        elif kind == 1:
+            word = f"{word} (n.)"
+        elif kind == 2:
+            word = f"{word}!?"
+        pool.append(word)
+    words = [rng.choice(pool) for _ in range(n)]
+    for i in range(0, n, 97):
+        words[i] = None
+    return words
+
+def timed(label, func, results):
+    start = time.perf_counter()
+    out = func()
+    elapsed = time.perf_counter() - start
+    results.append((label, elapsed))
+    return out
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=100_000, help="单词数量（默认 100000）")
+    parser.add_argument("--unique", type=int, default=5_000, help="不同单词的数量（默认 5000）")
+    args = parser.parse_args(argv)
+
+    words = make_words(args.n, args.unique)
+    results = []
+
+    expected = timed("旧版逐个 re.sub", lambda: [legacy_clean_word_for_tts(w) for w in words], results)
+    _clean_word_cached.cache_clear()
+    cold = timed("clean_word_for_tts（冷缓存）", lambda: [clean_word_for_tts(w) for w in words], results)
+    warm = timed("clean_word_for_tts（热缓存）", lambda: [clean_word_for_tts(w) for w in words], results)
+    _clean_word_cached.cache_clear()
+    batch = timed("clean_words(list)", lambda: clean_words(words), results)
+    assert cold == expected and warm == expected and batch == expected, "输出与旧版不一致！"
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pd = None
+    if pd is not None:
+        series = pd.Series(words, dtype=object)
+        vectorized = timed("clean_words(Series)", lambda: clean_words(series), results)
+        assert vectorized.tolist() == expected, "Series 输出与旧版不一致！"
+
+    base = results[0][1]
+    print(f"单词数 {args.n}，不同单词 {args.unique}，输出与旧版完全一致。")
+    for label, elapsed in results:
+        print(f"  {label:<28} {elapsed * 1000:9.1f} ms   {base / elapsed:6.1f}x")
+
+if __name__ == "__main__":
+    main()
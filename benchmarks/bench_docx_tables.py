@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Word 表格读取基准：对比 python-docx 对象模型（table.rows / row.cells / cell.text）与 docx_tables 流式解析
+生成一个含多个带合并单元格表格的 .docx，校验两者读出的内容完全一致
+用法：python benchmarks/bench_docx_tables.py [--tables 20] [--rows 100] [--cols 6]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from docx import Document  # noqa: E402
+from docx_tables import read_tables  # noqa: E402
+
+def make_document(path, tables, rows, cols, seed=0):
+    """生成测试文档：每个表格按行填充文本，并随机做横向/纵向合并。"""
+    rng = random.Random(seed)
+    doc = Document()
+    for ti in range(tables):
+        doc.add_paragraph(f"Table {ti + 1}")
+        table = doc.add_table(rows=rows, cols=cols)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f"T{ti}R{r}C{c} /wɜːd/"
+        for _ in range(rows // 5):
+            r0, c0 = rng.randrange(rows), rng.randrange(cols)
+            r1, c1 = min(rows - 1, r0 + rng.randint(0, 3)), min(cols - 1, c0 + rng.randint(0, 1))
+            try:
+                table.cell(r0, c0).merge(table.cell(r1, c1))
+            except Exception:
+                pass  # 与已有合并区域部分重叠，跳过
+    doc.save(path)
+
+def read_with_python_docx(path):
+    return [[[cell.text for cell in row.cells] for row in table.rows] for table in Document(path).tables]
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = func()
+        best = min(best, time.perf_counter() - start)
+    return out, best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=20, help="表格数量（默认 20）")
+    parser.add_argument("--rows", type=int, default=100, help="每个表格的行数（默认 100）")
+    parser.add_argument("--cols", type=int, default=6, help="每个表格的列数（默认 6）")
+    parser.add_argument("--repeat", type=int, default=3, help="每种做法重复次数，取最快一次（默认 3）")
+    args = parser.parse_args(argv)
+
+    fd, path = tempfile.mkstemp(suffix=".docx")
+    os.close(fd)
+    try:
+        make_document(path, args.tables, args.rows, args.cols)
+        expected, base = timed(lambda: read_with_python_docx(path), args.repeat)
+        actual, fast = timed(lambda: read_tables(path), args.repeat)
+    finally:
+        os.remove(path)
+    assert actual == expected, "docx_tables 与 python-docx 读出的内容不一致！"
+
+    cells = sum(len(row) for table in expected for row in table)
+    print(f"{args.tables} 个表格 x {args.rows} 行 x {args.cols} 列（展开后共 {cells} 个单元格），内容完全一致。")
+    print(f"  {'python-docx 对象模型':<24} {base * 1000:9.1f} ms   {1.0:6.1f}x")
+    print(f"  {'docx_tables 流式解析':<24} {fast * 1000:9.1f} ms   {base / fast:6.1f}x")
+
+if __name__ == "__main__":
+    main()
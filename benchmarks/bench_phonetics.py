@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+音标去除基准：对比逐单元格调用 _remove_between_slashes 与按列向量化的 remove_phonetics_from_frame
+默认生成 1M 个单元格的混合表格（文本列 + 数值列），并校验两者输出完全一致
+用法：python benchmarks/bench_phonetics.py [--rows 250000] [--text-cols 2] [--num-cols 2]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd  # noqa: E402
+from phonetics_remover_gui import _remove_between_slashes, remove_phonetics_from_frame  # noqa: E402
+
+SAMPLE_WORDS = ["apple", "doctor", "factory worker", "PE", "busy", "playground", "a lot of", "nurse"]
+SAMPLE_PHONETICS = ["/ˈæpl/", "/ˈdɒktər/", "/ˈbɪzi/", "/ˌpiːˈiː/", "/nɜːs/"]
+
+def make_frame(rows, text_cols, num_cols, seed=0):
+    """生成测试表格：文本列含单行/多行音标、单个斜杠和空值，数值列为整数和小数。"""
+    rng = random.Random(seed)
+    data = {}
+    for c in range(text_cols):
+        column = []
+        for i in range(rows):
+            word = rng.choice(SAMPLE_WORDS)
+            kind = i % 6
+            if kind == 0:
+                word = f"{word}\n{rng.choice(SAMPLE_PHONETICS)}"
+            elif kind == 1:
+                word = f"{word} {rng.choice(SAMPLE_PHONETICS)} 释义"
+            elif kind == 2:
+                word = f"{word}/{word}"  # 只有一个斜杠，保持不变
+            elif kind == 3 and i % 4 == 0:
+                word = None
+            column.append(word)
+        data[f"text{c}"] = column
+    for c in range(num_cols):
+        data[f"num{c}"] = [rng.random() * 100 if c % 2 else i for i in range(rows)]
+    return pd.DataFrame(data)
+
+def elementwise(df):
+    """旧版做法：每个单元格（包括数值）调用一次 Python 函数。"""
+    apply = getattr(df, "map", None) or df.applymap
+    return apply(_remove_between_slashes)
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = func()
+        best = min(best, time.perf_counter() - start)
+    return out, best
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=250_000, help="行数（默认 250000）")
+    parser.add_argument("--text-cols", type=int, default=2, help="文本列数（默认 2）")
+    parser.add_argument("--num-cols", type=int, default=2, help="数值列数（默认 2）")
+    parser.add_argument("--repeat", type=int, default=3, help="每种做法重复次数，取最快一次（默认 3）")
+    args = parser.parse_args(argv)
+
+    df = make_frame(args.rows, args.text_cols, args.num_cols)
+    expected, base = timed(lambda: elementwise(df), args.repeat)
+    actual, fast = timed(lambda: remove_phonetics_from_frame(df), args.repeat)
+    # 逐单元格结果的列类型由 pandas 重新推断，这里只比较内容
+    pd.testing.assert_frame_equal(actual.astype(object), expected.astype(object))
+
+    print(f"{args.rows} 行 x {df.shape[1]} 列 = {df.size} 个单元格，输出完全一致。")
+    print(f"  {'逐单元格 map/applymap':<28} {base * 1000:9.1f} ms   {1.0:6.1f}x")
+    print(f"  {'remove_phonetics_from_frame':<28} {fast * 1000:9.1f} ms   {base / fast:6.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+启动/导入耗时基准：用 `python -X importtime` 测量每个入口脚本执行到界面/提示出现前的导入开销
+- 入口脚本以 runpy.run_path(run_name='__bench__') 执行，只跑模块顶层代码，不会打开窗口
+- --save 把结果写成 JSON 基线；--compare 与基线比较，超过阈值时以非零状态退出
+用法：python benchmarks/bench_startup.py [--repeat 5] [--save base.json] [--compare base.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+ENTRY_POINTS = [
+    "word_typer.py",
+    "anki_generator.py",
+    "phonetics_remover_gui.py",
+    "python word_table_converter_ui.py",
+    "提取Word表格写入到Excel.py",
+]
+
+def parse_importtime(stderr):
+    """解析 -X importtime 输出，返回 (总导入微秒, {顶层模块: 累计微秒})。"""
+    total = 0
+    top_level = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, name = int(fields[0]), int(fields[1]), fields[2]
+        total += self_us
+        if not name.startswith("  "):  # 没有缩进的是被顶层直接导入的模块
+            top_level[name.strip()] = cumulative_us
+    return total, top_level
+
+def measure(script, repeat):
+    """多次运行入口脚本的顶层代码，返回中位数结果。"""
+    code = f"import runpy, sys; sys.path.insert(0, {str(ROOT)!r}); runpy.run_path({str(ROOT / script)!r}, run_name='__bench__')"
+    walls, imports, heaviest, error = [], [], {}, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                              capture_output=True, text=True, cwd=ROOT, env=dict(os.environ, PYTHONDONTWRITEBYTECODE="1"))
+        walls.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+            break
+        total, top_level = parse_importtime(proc.stderr)
+        imports.append(total)
+        heaviest = top_level
+    result = {
+        "wall_ms": round(statistics.median(walls) * 1000, 1),
+        "import_ms": round(statistics.median(imports) / 1000, 1) if imports else None,
+        "heaviest": [name for name, _ in sorted(heaviest.items(), key=lambda kv: -kv[1])[:3]],
+    }
+    if error:
+        result["error"] = error
+    return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="每个入口运行次数，取中位数（默认 5）")
+    parser.add_argument("--save", help="把结果保存为 JSON 基线")
+    parser.add_argument("--compare", help="与 JSON 基线比较")
+    parser.add_argument("--threshold", type=float, default=1.25, help="导入耗时超过基线的倍数视为退化（默认 1.25）")
+    args = parser.parse_args(argv)
+
+    results = {script: measure(script, args.repeat) for script in ENTRY_POINTS}
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else {}
+
+    regressions = []
+    print(f"{'入口':<36}{'总耗时(ms)':>12}{'导入(ms)':>12}  最重的导入")
+    for script, r in results.items():
+        if "error" in r:
+            print(f"{script:<36}{'失败':>12}{'':>12}  {r['error']}")
+            continue
+        line = f"{script:<36}{r['wall_ms']:>12.1f}{r['import_ms']:>12.1f}  {', '.join(r['heaviest'])}"
+        base = baseline.get(script, {}).get("import_ms")
+        if base:
+            ratio = r["import_ms"] / base
+            line += f"   基线 {base:.1f} ms（{ratio:.2f}x）"
+            if ratio > args.threshold:
+                regressions.append(script)
+        print(line)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"结果已保存到 {args.save}")
+    if regressions:
+        print(f"启动耗时退化：{', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+合并单元格网格基准：对比旧版 build_table_grid（row.cells 逐行向上找合并顶部 + 向上/向下重新扫描 rowspan）
+与单次遍历的新版，在行数逐级翻倍、纵向合并很多的表格上观察耗时的增长曲线，并校验两者输出完全一致
+每个表格：第 1 列整列纵向合并，第 2 列每 BLOCK 行合并一次，第 3、4 列横向合并，其余为普通单元格
+旧版在整列合并约 1000 行时会因 row.cells 递归过深而抛出 RecursionError，所以只在不超过 --old-max-rows 的档位运行
+用法：python benchmarks/bench_table_grid.py [--rows 125 250 500 1000 2000 4000] [--old-max-rows 500]
+"""
+import argparse
+import runpy
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from docx import Document  # noqa: E402
+from docx.oxml import OxmlElement  # noqa: E402
+from docx.oxml.ns import qn  # noqa: E402
+
+extractor = runpy.run_path(str(ROOT / "提取Word表格写入到Excel.py"), run_name="__bench__")
+GridCell, build_table_grid = extractor["GridCell"], extractor["build_table_grid"]
+
+def _get_tcPr_prop(cell, name):
+    try:
+        return getattr(cell._tc.tcPr, name)
+    except AttributeError:
+        return None
+
+def _to_int(val, default=1):
+    try:
+        return int(str(val).strip())
+    except (ValueError, TypeError):
+        return default
+
+def build_table_grid_rescan(table):
+    """旧版实现（原样保留，作为对照）。"""
+    col_counts = [sum(_to_int(getattr(_get_tcPr_prop(cell, "gridSpan"), "val", 1)) for cell in row.cells) for row in table.rows]
+    n_rows = len(table.rows)
+    n_cols = max(col_counts) if col_counts else 0
+    if not n_rows or not n_cols:
+        return [], 0, 0
+    grid = [[None for _ in range(n_cols)] for _ in range(n_rows)]
+    for r_idx, row in enumerate(table.rows):
+        c_idx = 0
+        for cell in row.cells:
+            while c_idx < n_cols and grid[r_idx][c_idx] is not None:
+                c_idx += 1
+            if c_idx >= n_cols:
+                break
+            grid_span = _get_tcPr_prop(cell, "gridSpan")
+            colspan = _to_int(getattr(grid_span, "val", 1)) if grid_span else 1
+            rowspan = 1
+            v_merge = _get_tcPr_prop(cell, "vMerge")
+            is_continue = False
+            if v_merge is not None:
+                val = getattr(v_merge, "val", None)
+                if val is None or str(val).lower() == "continue":
+                    is_continue = True
+            if is_continue:
+                for r_scan in range(r_idx - 1, -1, -1):
+                    if grid[r_scan][c_idx] and grid[r_scan][c_idx].anchor:
+                        anchor_r, anchor_c = grid[r_scan][c_idx].anchor
+                        if grid[anchor_r][anchor_c]:
+                            grid[anchor_r][anchor_c].rowspan += 1
+                        break
+            text = cell.text.replace("\n", " ").strip()
+            anchor_pos = (r_idx, c_idx)
+            for i in range(rowspan):
+                for j in range(colspan):
+                    if r_idx + i < n_rows and c_idx + j < n_cols:
+                        is_anchor_cell = (i == 0 and j == 0)
+                        grid[r_idx + i][c_idx + j] = GridCell(
+                            anchor=anchor_pos, visible=is_anchor_cell, text=text if is_anchor_cell else "",
+                            rowspan=rowspan if is_anchor_cell else 1, colspan=colspan if is_anchor_cell else 1)
+            c_idx += colspan
+    for r in range(n_rows - 2, -1, -1):
+        for c in range(n_cols):
+            cell = grid[r][c]
+            if cell and cell.visible:
+                below_cell = grid[r + 1][c]
+                if below_cell and not below_cell.visible and below_cell.anchor == cell.anchor:
+                    final_rowspan = 1
+                    for r_scan in range(r + 1, n_rows):
+                        scan_cell = grid[r_scan][c]
+                        if scan_cell and scan_cell.anchor == cell.anchor:
+                            final_rowspan += 1
+                        else:
+                            break
+                    cell.rowspan = final_rowspan
+    for r in range(n_rows):
+        for c in range(n_cols):
+            if grid[r][c] is None:
+                grid[r][c] = GridCell()
+    return grid, n_rows, n_cols
+
+def _set_v_merge(tc, val):
+    v_merge = OxmlElement("w:vMerge")
+    if val:
+        v_merge.set(qn("w:val"), val)
+    tc.get_or_add_tcPr().append(v_merge)
+
+def make_table(rows, cols, block):
+    """直接改写 XML 生成合并单元格（python-docx 的 merge 在大表上本身就很慢）。"""
+    table = Document().add_table(rows=rows, cols=cols)
+    for r, tr in enumerate(table._tbl.tr_lst):
+        tcs = tr.tc_lst
+        for c, tc in enumerate(tcs):
+            tc.p_lst[0].add_r().text = f"R{r}C{c}"
+        _set_v_merge(tcs[0], "restart" if r == 0 else None)
+        if cols > 1:
+            _set_v_merge(tcs[1], "restart" if r % block == 0 else "continue")
+        if cols > 3:
+            tcs[2].grid_span = 2
+            tr.remove(tcs[3])
+    return table
+
+def dump(result):
+    grid, n_rows, n_cols = result
+    return n_rows, n_cols, [[(c.anchor, c.visible, c.text, c.rowspan, c.colspan) for c in row] for row in grid]
+
+def timed(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = func()
+        best = min(best, time.perf_counter() - start)
+    return out, best
+
+def fmt_ms(seconds):
+    return f"{seconds * 1000:12.1f}" if seconds else f"{'-':>12}"
+
+def fmt_ratio(a, b):
+    return f"{a / b:7.1f}x" if a and b else f"{'-':>8}"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[125, 250, 500, 1000, 2000, 4000],
+                        help="各档行数（默认 125 250 500 1000 2000 4000）")
+    parser.add_argument("--old-max-rows", type=int, default=500, help="旧版只在不超过该行数的档位运行（默认 500）")
+    parser.add_argument("--cols", type=int, default=6, help="列数（默认 6）")
+    parser.add_argument("--block", type=int, default=50, help="第 2 列每多少行合并一次（默认 50）")
+    parser.add_argument("--repeat", type=int, default=1, help="每种做法重复次数，取最快一次（默认 1）")
+    args = parser.parse_args(argv)
+
+    print(f"{'行数':>6} {'旧版 (ms)':>12} {'新版 (ms)':>12} {'加速':>8}   {'旧版增长':>8} {'新版增长':>8}")
+    previous = (None, None)
+    for rows in args.rows:
+        table = make_table(rows, args.cols, args.block)
+        actual, fast = timed(lambda: build_table_grid(table), args.repeat)
+        base = None
+        if rows <= args.old_max_rows:
+            expected, base = timed(lambda: build_table_grid_rescan(table), args.repeat)
+            assert dump(actual) == dump(expected), f"{rows} 行：新旧 build_table_grid 输出不一致！"
+        print(f"{rows:>6} {fmt_ms(base)} {fmt_ms(fast)} {fmt_ratio(base, fast)}   "
+              f"{fmt_ratio(base, previous[0])} {fmt_ratio(fast, previous[1])}")
+        previous = (base, fast)
+    print("行数每翻一倍：线性算法耗时约翻一倍，平方级算法约变为四倍。两者都运行的档位输出完全一致。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+单词表加载基准：对比旧版 iterrows 逐行循环、word_loader 的按列过滤和编译缓存命中
+用法：python benchmarks/bench_word_loader.py [--rows 500000] [--chunksize 100000]
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd  # noqa: E402
+from utils import clean_word_for_tts  # noqa: E402
+from word_loader import load_word_records, cache_path_for  # noqa: E402
+
+SAMPLE_WORDS = ["PE", "job", "doctor", "farmer", "nurse", "worker", "office worker", "busy"]
+SAMPLE_PHONETICS = ["/ˌpiːˈiː/", "/dʒɒb/", "/ˈdɒktər/", "/ˈfɑːmər/", "/nɜːs/"]
+SAMPLE_MEANINGS = ["体育教育", "⼯作", "医⽣;博⼠\nv. 篡改", "农场主;农⺠", "护⼠;保姆"]
+
+def write_csv(path, rows, seed=0):
+    """生成与 anki_words.csv 结构相同的单词表（含多行单元格、标题行和空行）。"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Word", "Meaning"])
+        writer.writerow(["英⽂", "中⽂"])
+        for i in range(rows):
+            word = f"{rng.choice(SAMPLE_WORDS)}{i % 5000}"
+            if i % 3 == 0:
+                word = f"{word}\n{rng.choice(SAMPLE_PHONETICS)}"
+            meaning = "" if i % 101 == 0 else rng.choice(SAMPLE_MEANINGS)
+            writer.writerow([word, meaning])
+
+def legacy_load(path):
+    """旧版 anki_generator.main 中的逐行循环（不含音频与建卡）。"""
+    df = pd.read_csv(path)
+    entries = []
+    for index, row in df.iterrows():
+        word_raw = str(row['Word']).strip()
+        meaning = str(row['Meaning']).strip()
+        if word_raw.lower() == 'word' or meaning.lower() == 'meaning':
+            continue
+        if word_raw.lower() in ('英​文', '英⽂') or meaning.lower() in ('中​文', '中⽂'):
+            continue
+        english_word_clean = clean_word_for_tts(word_raw)
+        if not english_word_clean or not meaning or meaning == 'nan':
+            continue
+        entries.append((word_raw, meaning, english_word_clean))
+    return entries
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=500_000, help="数据行数（默认 500000）")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="流式读取的块大小（默认 100000）")
+    args = parser.parse_args(argv)
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    try:
+        write_csv(path, args.rows)
+        timings = []
+        for label, func in [
+            ("旧版 iterrows 循环", lambda: legacy_load(path)),
+            ("load_word_records（不用缓存）", lambda: load_word_records(path, verbose=False, use_cache=False)),
+            (f"load_word_records(chunksize={args.chunksize})",
+             lambda: load_word_records(path, chunksize=args.chunksize, verbose=False, use_cache=False)),
+            ("load_word_records（编译缓存）", lambda: load_word_records(path, verbose=False)),
+            ("load_word_records（缓存命中）", lambda: load_word_records(path, verbose=False)),
+        ]:
+            start = time.perf_counter()
+            result = func()
+            timings.append((label, time.perf_counter() - start, len(result)))
+            if label.startswith("旧版"):
+                expected = result
+            else:
+                assert [tuple(r) for r in result] == expected, f"{label} 的结果与旧版不一致！"
+    finally:
+        os.remove(path)
+        if os.path.exists(cache_path_for(path)):
+            os.remove(cache_path_for(path))
+
+    base = timings[0][1]
+    print(f"数据行数 {args.rows}，结果与旧版一致。")
+    for label, elapsed, count in timings:
+        print(f"  {label:<36} {elapsed:8.2f} s   {base / elapsed:6.1f}x   ({count} 条)")
+
+if __name__ == "__main__":
+    main()
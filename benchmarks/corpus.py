@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+合成测试语料：离线生成各工具的输入文件，供 run_all.py 和各个基准使用，固定 seed 时每次生成的内容完全相同
+- 单词表 CSV：结构与 anki_words.csv 相同（标题行、"英⽂,中⽂" 行、空行、单词后换行跟音标、多行释义）
+- 大表 XLSX：Word / Phonetic / Meaning / Example 四列，单元格里混有音标、多行文本和空值
+- Word 表单：模板（单元格里写 {{标记名}}）和与模板版式相同、填好内容的表单；表格数、行列数和合并单元格的密度都可调
+  第 1 列按密度做纵向合并（分组标签），中间各列按密度做横向合并，每行最后一个单元格是要提取的值
+用法：python benchmarks/corpus.py 输出目录 [--words 20000] [--sheet-rows 20000] [--forms 50] [--tables 3] [--rows 30]
+"""
+import argparse
+import copy
+import csv
+import random
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from docx import Document  # noqa: E402
+from docx.oxml import OxmlElement  # noqa: E402
+from docx.oxml.ns import qn  # noqa: E402
+
+SAMPLE_WORDS = ["PE", "job", "doctor", "farmer", "nurse", "worker", "office worker", "busy", "playground",
+                "a lot of", "library", "teacher's office", "art room", "computer room"]
+SAMPLE_PHONETICS = ["/ˌpiːˈiː/", "/dʒɒb/", "/ˈdɒktər/", "/ˈfɑːmər/", "/nɜːs/", "/ˈbɪzi/", "/ˈlaɪbrəri/"]
+SAMPLE_MEANINGS = ["体育教育", "⼯作", "医⽣;博⼠", "农场主;农⺠", "护⼠;保姆", "忙碌的", "图书馆", "许多"]
+SAMPLE_EXAMPLES = ["I like PE.", "What's your job?", "She is a doctor.", "The library is on the first floor."]
+
+# 默认规模：run_all.py 在一台普通笔记本上约一分钟跑完
+DEFAULTS = {"words": 20000, "sheet_rows": 20000, "forms": 50, "tables": 3, "rows": 30, "cols": 4,
+            "merge_density": 0.3, "grid_rows": 1000, "seed": 0}
+
+
+# --- 单词表 / 大表 --- #
+def write_word_csv(path, rows, seed=0, phonetic_ratio=0.5, multiline_ratio=0.2, blank_every=200):
+    """
+    生成单词表 CSV。phonetic_ratio 为单词后换行跟音标的比例，multiline_ratio 为多行释义的比例，
+    每 blank_every 行插入一个空行。单词都带序号，清理后互不重复（打包牌组时不会因去重而变少）。
+    """
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Word", "Meaning"])
+        writer.writerow(["英⽂", "中⽂"])
+        for i in range(rows):
+            word = f"{rng.choice(SAMPLE_WORDS)} {i}"
+            if rng.random() < phonetic_ratio:
+                word = f"{word}\n{rng.choice(SAMPLE_PHONETICS)}"
+            meaning = rng.choice(SAMPLE_MEANINGS)
+            if rng.random() < multiline_ratio:
+                meaning = f"{meaning}\n;\"{rng.choice(SAMPLE_EXAMPLES)}\""
+            writer.writerow([word, meaning])
+            if blank_every and i % blank_every == blank_every - 1:
+                writer.writerow(["", ""])
+    return path
+
+
+def write_sheet_xlsx(path, rows, seed=0, phonetic_ratio=0.5):
+    """生成大表 XLSX（openpyxl 只写模式，行数很大时内存占用也不高）。"""
+    from openpyxl import Workbook
+    rng = random.Random(seed)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Words")
+    ws.append(["Word", "Phonetic", "Meaning", "Example"])
+    for i in range(rows):
+        word = f"{rng.choice(SAMPLE_WORDS)} {i}"
+        phonetic = rng.choice(SAMPLE_PHONETICS)
+        if rng.random() < phonetic_ratio:
+            word = f"{word} {phonetic}"
+        example = None if i % 7 == 0 else f"{rng.choice(SAMPLE_EXAMPLES)}\n{phonetic}"
+        ws.append([word, phonetic, rng.choice(SAMPLE_MEANINGS), example])
+    wb.save(path)
+    return path
+
+
+# --- Word 表单 --- #
+def _set_v_merge(tc, val):
+    v_merge = OxmlElement("w:vMerge")
+    if val:
+        v_merge.set(qn("w:val"), val)
+    tc.get_or_add_tcPr().append(v_merge)
+
+
+def form_layout(rows, cols, merge_density, seed=0):
+    """
+    随机生成一个表格的合并版式：返回每行的单元格列表 [(起始列, 横向跨列数, 纵向合并值)]。
+    纵向合并值为 "restart" / "continue" / None，只出现在第 1 列；同一 seed 总是得到同一版式。
+    """
+    rng = random.Random(seed)
+    layout = []
+    for r in range(rows):
+        cells = []
+        if cols > 1:
+            # 第 1 列：以 merge_density 的概率与上一行合并成一组
+            if r > 0 and rng.random() < merge_density:
+                cells.append((0, 1, "continue"))
+                if layout[-1][0][2] is None:
+                    layout[-1][0] = (0, 1, "restart")
+            else:
+                cells.append((0, 1, None))
+        c = 1 if cols > 1 else 0
+        while c < cols:
+            # 最后一列是值单元格，不参与横向合并（否则同一个标记会在两列各出现一次）
+            span = 2 if c + 2 < cols and rng.random() < merge_density else 1
+            cells.append((c, span, None))
+            c += span
+        layout.append(cells)
+    return layout
+
+
+def make_form_table(doc, layout, cols, text_for):
+    """
+    按版式在 doc 末尾添加一个表格；text_for(行, 单元格序号, 是否为该行最后一个单元格) 返回单元格文本。
+    直接改写 XML 做合并（python-docx 的 merge 在大表上本身就很慢）。
+    """
+    table = doc.add_table(rows=len(layout), cols=cols)
+    for r, (tr, cells) in enumerate(zip(table._tbl.tr_lst, layout)):
+        tcs = tr.tc_lst
+        for i, (c, span, v_merge) in enumerate(cells):
+            tc = tcs[c]
+            if span > 1:
+                tc.grid_span = span
+                for extra in tcs[c + 1:c + span]:
+                    tr.remove(extra)
+            if v_merge:
+                _set_v_merge(tc, v_merge)
+            if v_merge != "continue":
+                tc.p_lst[0].add_r().text = text_for(r, i, i == len(cells) - 1)
+    return table
+
+
+def _form_text(ti, form):
+    """表单单元格文本：模板 (form 为 None) 的值单元格写 {{标记名}}，表单里写对应的值。"""
+    def text_for(r, i, is_value):
+        if not is_value:
+            return f"T{ti + 1}项目{r + 1}" if i == 0 else f"说明 {r + 1}-{i} /wɜːd/"
+        return f"{{{{T{ti + 1}字段{r + 1}}}}}" if form is None else f"表单{form} T{ti + 1}R{r + 1}"
+    return text_for
+
+
+def write_form_docx(path, tables=3, rows=30, cols=4, merge_density=0.3, seed=0, form=None):
+    """
+    生成 Word 表单：form 为 None 时生成模板，否则生成第 form 份填好的表单（与模板版式相同）。
+    每个表格的版式由 (seed, 表序) 决定，所以模板和各份表单的标记坐标一一对应。
+    """
+    doc = Document()
+    for ti in range(tables):
+        doc.add_paragraph(f"第 {ti + 1} 部分")
+        make_form_table(doc, form_layout(rows, cols, merge_density, seed * 1000 + ti), cols, _form_text(ti, form))
+    doc.save(path)
+    return path
+
+
+def write_grid_docx(path, rows=1000, cols=6, merge_density=0.3, seed=0):
+    """生成一个只含一个大表格的文档（测合并单元格网格构建）。"""
+    return write_form_docx(path, tables=1, rows=rows, cols=cols, merge_density=merge_density, seed=seed)
+
+
+def write_forms(folder, count, tables=3, rows=30, cols=4, merge_density=0.3, seed=0):
+    """
+    生成模板和 count 份表单：模板为 folder/template.docx，表单在 folder/Files/ 下。
+    各份表单只有值单元格的文本不同，先生成一份再复制 XML 改值，比逐份重建快得多。
+
+    Returns:
+        (Path, list[Path]): 模板路径和表单路径列表。
+    """
+    folder = Path(folder)
+    files_dir = folder / "Files"
+    files_dir.mkdir(parents=True, exist_ok=True)
+    template = write_form_docx(folder / "template.docx", tables, rows, cols, merge_density, seed)
+    base = Document()
+    for ti in range(tables):
+        base.add_paragraph(f"第 {ti + 1} 部分")
+        make_form_table(base, form_layout(rows, cols, merge_density, seed * 1000 + ti), cols, _form_text(ti, 0))
+    body = copy.deepcopy(base.element.body)
+    paths = []
+    for n in range(1, count + 1):
+        doc = Document()
+        doc.element.replace(doc.element.body, copy.deepcopy(body))
+        for t in doc.element.body.iter(qn("w:t")):
+            if t.text.startswith("表单0 "):
+                t.text = f"表单{n} " + t.text[len("表单0 "):]
+        path = files_dir / f"form_{n:04d}.docx"
+        doc.save(path)
+        paths.append(path)
+    return template, paths
+
+
+# --- 完整语料 --- #
+def make_corpus(folder, words=DEFAULTS["words"], sheet_rows=DEFAULTS["sheet_rows"], forms=DEFAULTS["forms"],
+                tables=DEFAULTS["tables"], rows=DEFAULTS["rows"], cols=DEFAULTS["cols"],
+                merge_density=DEFAULTS["merge_density"], grid_rows=DEFAULTS["grid_rows"], seed=DEFAULTS["seed"]):
+    """
+    在 folder 下生成全部语料：words.csv、sheet.xlsx、template.docx + Files/*.docx、grid.docx。
+
+    Returns:
+        dict: 各文件的路径（forms 为表单路径列表）。
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    template, form_paths = write_forms(folder, forms, tables, rows, cols, merge_density, seed)
+    return {
+        "words_csv": write_word_csv(folder / "words.csv", words, seed),
+        "sheet_xlsx": write_sheet_xlsx(folder / "sheet.xlsx", sheet_rows, seed),
+        "template": template,
+        "forms": form_paths,
+        "grid_docx": write_grid_docx(folder / "grid.docx", grid_rows, max(cols, 6), merge_density, seed),
+    }
+
+
+def add_corpus_args(parser):
+    """语料规模参数（corpus.py 和 run_all.py 共用）。"""
+    parser.add_argument("--words", type=int, default=DEFAULTS["words"], help="单词表行数（默认 %(default)s）")
+    parser.add_argument("--sheet-rows", type=int, default=DEFAULTS["sheet_rows"], help="XLSX 大表行数（默认 %(default)s）")
+    parser.add_argument("--forms", type=int, default=DEFAULTS["forms"], help="Word 表单份数（默认 %(default)s）")
+    parser.add_argument("--tables", type=int, default=DEFAULTS["tables"], help="每份表单的表格数（默认 %(default)s）")
+    parser.add_argument("--rows", type=int, default=DEFAULTS["rows"], help="表单中每个表格的行数（默认 %(default)s）")
+    parser.add_argument("--cols", type=int, default=DEFAULTS["cols"], help="表单中每个表格的列数（默认 %(default)s）")
+    parser.add_argument("--merge-density", type=float, default=DEFAULTS["merge_density"],
+                        help="合并单元格密度 0~1（默认 %(default)s）")
+    parser.add_argument("--grid-rows", type=int, default=DEFAULTS["grid_rows"],
+                        help="网格基准用的大表格行数（默认 %(default)s）")
+    parser.add_argument("--seed", type=int, default=DEFAULTS["seed"], help="随机种子（默认 %(default)s）")
+
+
+def corpus_params(args):
+    return {key: getattr(args, key) for key in DEFAULTS}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("folder", help="输出目录")
+    add_corpus_args(parser)
+    args = parser.parse_args(argv)
+    paths = make_corpus(args.folder, **corpus_params(args))
+    for name, path in paths.items():
+        print(f"{name:<12} {f'{len(path)} 个文件' if isinstance(path, list) else path}")
+
+if __name__ == "__main__":
+    main()
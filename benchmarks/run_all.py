@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+全流程基准：用 corpus.py 生成合成语料，依次测各工具的主要阶段，结果可保存为基线并与之比较（完全离线）
+- load：word_loader 读取单词表（不用缓存 / 命中编译缓存）
+- clean：去除音标（CSV 单词表、XLSX 大表）
+- grid：合并单元格网格构建（一个大表格）
+- extract：读模板标记、逐个提取表单写入汇总表（不用缓存 / 命中结果缓存）
+- convert：Word 表格转换为 JSON / HTML / Excel
+- deck：Anki 牌组的笔记整理、发音生成（假 TTS 后端，每次都用空的发音缓存）和 .apkg 打包
+每个阶段重复 --repeat 次取最快一次；提取和转换都在当前进程里逐个处理，避免进程池启动时间带来的波动
+用法：python benchmarks/run_all.py [--repeat 3] [--only load deck] [--save base.json] [--compare base.json]
+      语料规模参数见 corpus.py（--words / --forms / --merge-density 等）
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import platform
+import runpy
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import genanki  # noqa: E402
+from docx import Document  # noqa: E402
+from corpus import make_corpus, add_corpus_args, corpus_params  # noqa: E402
+from word_loader import load_word_records  # noqa: E402
+from phonetics_remover_gui import clean_file  # noqa: E402
+from extract_cache import ResultCache  # noqa: E402
+from audio_cache import AudioCache  # noqa: E402
+from tts_engine import get_backend  # noqa: E402
+from anki_generator import collect_entries, resolve_audio, write_package, TTS_MAX_WORKERS  # noqa: E402
+
+extractor = runpy.run_path(str(ROOT / "提取Word表格写入到Excel.py"), run_name="__bench__")
+converter = runpy.run_path(str(ROOT / "python word_table_converter_ui.py"), run_name="__bench__")
+WordExtractor, build_table_grid = extractor["WordExtractor"], extractor["build_table_grid"]
+WordTableParser = converter["WordTableParser"]
+
+RESULTS_VERSION = 1
+
+def timed(func, repeat, setup=None):
+    """
+    运行 repeat 次取最快一次；每次运行前先调用 setup（不计时），其返回值作为 func 的参数。
+    各工具打印的进度信息不输出到终端。
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            args = setup() if setup else ()
+            start = time.perf_counter()
+            out = func(*args)
+            best = min(best, time.perf_counter() - start)
+    return out, best
+
+def build_stages(corpus, work, tts_latency, deck_words):
+    """
+    返回 [(阶段名, 单位, 准备函数, 函数)]，函数返回本次处理的数量（行数、文件数等），用于计算吞吐量。
+    后面的阶段会用到前面阶段的结果（如 deck.* 用 load.csv 读出的单词），所以按顺序运行。
+    """
+    state = {}
+    counter = itertools.count()
+
+    def load_csv():
+        state["records"] = load_word_records(corpus["words_csv"], verbose=False, use_cache=False)
+        return len(state["records"])
+
+    def load_cached():
+        return len(load_word_records(corpus["words_csv"], verbose=False))
+
+    def clean(src, dst):
+        return lambda: clean_file(src, work / dst)[0]
+
+    def extract_template():
+        state["marks"] = WordExtractor.collect_marks_from_template(corpus["template"])
+        return len(state["marks"])
+
+    def extract_forms(cache=None):
+        headers = ["文件名"] + [m["name"] for m in state["marks"]]
+        rows = WordExtractor.iter_extracted_rows(corpus["forms"], list(state["marks"]), lambda msg: None,
+                                                 workers=1, cache=cache)
+        return WordExtractor.save_to_excel(rows, headers, work / "汇总.xlsx")
+
+    def primed_cache():
+        if "cache" not in state:
+            state["cache"] = ResultCache(work / "extract_cache.sqlite")
+            extract_forms(state["cache"])  # 先填满缓存，之后每次都全部命中
+        return (state["cache"],)
+
+    def convert(method, ext):
+        def run():
+            return sum(method(WordTableParser(str(path)), str(work / f"{path.stem}{ext}"))
+                       for path in corpus["forms"])
+        return run
+
+    def deck_collect():
+        state["entries"] = collect_entries(genanki, state["records"][:deck_words], "基准牌组")
+        return len(state["entries"])
+
+    def empty_audio_cache():
+        # 每次都用新的空缓存，测的是全部单词都要生成时的耗时
+        return (AudioCache(str(work / f"media{next(counter)}")),)
+
+    def deck_tts(cache):
+        backend = get_backend("fake", latency=tts_latency)
+        words = [word for _, word, _, _ in state["entries"]]
+        state["audio_paths"] = resolve_audio(words, cache, backend, TTS_MAX_WORKERS)
+        return len(state["audio_paths"])
+
+    def deck_package():
+        write_package(genanki, str(work / "deck.apkg"), [("基准牌组", state["entries"])], state["audio_paths"])
+        return len(state["entries"])
+
+    def load_grid_table():
+        return (state.setdefault("grid_table", Document(corpus["grid_docx"]).tables[0]),)
+
+    return [
+        ("load.csv", "行", None, load_csv),
+        ("load.cached", "行", None, load_cached),
+        ("clean.csv", "行", None, clean(corpus["words_csv"], "words_no_phonetics.csv")),
+        ("clean.xlsx", "行", None, clean(corpus["sheet_xlsx"], "sheet_no_phonetics.xlsx")),
+        ("grid.build", "行", load_grid_table, lambda table: build_table_grid(table)[1]),
+        ("extract.template", "标记", None, extract_template),
+        ("extract.forms", "文件", None, extract_forms),
+        ("extract.cached", "文件", primed_cache, extract_forms),
+        ("convert.json", "表格", None, convert(WordTableParser.save_as_json, ".json")),
+        ("convert.html", "表格", None, convert(WordTableParser.save_as_html, ".html")),
+        ("convert.xlsx", "表格", None, convert(WordTableParser.save_as_excel, ".xlsx")),
+        ("deck.collect", "笔记", None, deck_collect),
+        ("deck.tts", "发音", empty_audio_cache, deck_tts),
+        ("deck.package", "笔记", None, deck_package),
+    ], state
+
+# 只运行某些阶段时，还需要先运行它们依赖的阶段
+DEPENDS = {"extract.forms": ["extract.template"], "extract.cached": ["extract.template"],
+           "deck.collect": ["load.csv"], "deck.tts": ["load.csv", "deck.collect"],
+           "deck.package": ["load.csv", "deck.collect", "deck.tts"]}
+
+def select_stages(stages, only):
+    """按阶段名或前缀（如 deck）筛选，并补上依赖的阶段。"""
+    if not only:
+        return [name for name, _, _, _ in stages]
+    wanted = {name for name, _, _, _ in stages if any(name == p or name.startswith(p + ".") for p in only)}
+    for name in list(wanted):
+        wanted.update(DEPENDS.get(name, []))
+    return [name for name, _, _, _ in stages if name in wanted]
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """返回 {阶段名: 与基线的耗时比值} 和退化的阶段列表；语料规模或运行设置不同时不比较。"""
+    if not baseline:
+        return {}, []
+    if baseline.get("corpus") != results["corpus"] or baseline.get("settings") != results["settings"]:
+        print("注意：基线的语料规模或运行设置与本次不同，不做比较。")
+        return {}, []
+    ratios, regressions = {}, []
+    for name, stage in results["stages"].items():
+        base = baseline.get("stages", {}).get(name, {}).get("ms")
+        if not base:
+            continue
+        ratios[name] = stage["ms"] / base
+        if ratios[name] > threshold and stage["ms"] - base >= min_delta_ms:
+            regressions.append(name)
+    return ratios, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_corpus_args(parser)
+    parser.add_argument("--repeat", type=int, default=3, help="每个阶段重复次数，取最快一次（默认 3）")
+    parser.add_argument("--only", nargs="+", metavar="STAGE", help="只运行这些阶段（阶段名或前缀，如 deck、extract.forms）")
+    parser.add_argument("--deck-words", type=int, default=5000,
+                        help="deck.* 阶段只用单词表的前这么多个单词（默认 5000）")
+    parser.add_argument("--tts-latency", type=float, default=0.0, help="假 TTS 后端每个单词的模拟延迟秒数（默认 0）")
+    parser.add_argument("--keep", help="把语料和输出保存到该目录（默认用临时目录，结束后删除）")
+    parser.add_argument("--save", help="把结果保存为 JSON 基线")
+    parser.add_argument("--compare", help="与 JSON 基线比较")
+    parser.add_argument("--threshold", type=float, default=1.25, help="耗时超过基线的倍数视为退化（默认 1.25）")
+    parser.add_argument("--min-delta-ms", type=float, default=10.0,
+                        help="比基线慢不到这么多毫秒时不算退化，避免很短的阶段因波动误报（默认 10）")
+    args = parser.parse_args(argv)
+
+    folder = Path(args.keep) if args.keep else Path(tempfile.mkdtemp(prefix="wordtools-bench-"))
+    try:
+        start = time.perf_counter()
+        corpus = make_corpus(folder / "corpus", **corpus_params(args))
+        print(f"语料已生成（{time.perf_counter() - start:.1f} 秒）：{folder / 'corpus'}")
+        work = folder / "output"
+        work.mkdir(parents=True, exist_ok=True)
+
+        stages, state = build_stages(corpus, work, args.tts_latency, args.deck_words)
+        selected = select_stages(stages, args.only)
+        results = {"version": RESULTS_VERSION, "python": platform.python_version(), "platform": platform.platform(),
+                   "corpus": corpus_params(args), "repeat": args.repeat,
+                   "settings": {"deck_words": args.deck_words, "tts_latency": args.tts_latency}, "stages": {}}
+        for name, unit, setup, func in stages:
+            if name in selected:
+                items, seconds = timed(func, args.repeat, setup)
+                results["stages"][name] = {"ms": round(seconds * 1000, 1), "items": items, "unit": unit}
+        if "cache" in state:
+            state["cache"].close()
+    finally:
+        if not args.keep:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")) if args.compare else {}
+    ratios, regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+
+    print(f"{'阶段':<18}{'耗时(ms)':>12}{'数量':>10}  {'吞吐量':<16}")
+    for name, stage in results["stages"].items():
+        rate = stage["items"] / max(stage["ms"] / 1000, 1e-9)
+        throughput = f"{rate:,.0f} {stage['unit']}/秒"
+        line = f"{name:<18}{stage['ms']:>12.1f}{stage['items']:>10}  {throughput:<16}"
+        if name in ratios:
+            line += f"  基线 {baseline['stages'][name]['ms']:.1f} ms（{ratios[name]:.2f}x）"
+            if name in regressions:
+                line += "  ← 退化"
+        print(line)
+
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"结果已保存到 {args.save}")
+    if regressions:
+        print(f"性能退化：{', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
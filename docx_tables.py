@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+直接读取 .docx 表格的轻量解析器（提取Word表格写入到Excel.py 与 python word_table_converter_ui.py 共用）
+- 从 zip 包里流式解析主文档 word/document.xml（xml.etree 的 iterparse），不构建 python-docx 对象模型
+- 只产出正文顶层的表格（与 python-docx 的 Document.tables 相同），单元格里嵌套的表格不单独产出
+- 每一行按布局网格展开，与 python-docx 的 row.cells 一致：
+  横向合并 (gridSpan) 的单元格按所跨列数重复出现，纵向合并 (vMerge continue) 的单元格取合并区域最上方单元格
+- 单元格文本与 python-docx 的 cell.text 一致：段落之间用换行连接，w:tab 为制表符，w:br/w:cr 为换行
+- 逐个表格惰性产出，解析过的行立即从树上移除，内存占用只与单个表格的大小有关
+"""
+import zipfile
+import xml.etree.ElementTree as ET
+
+# --- 配置 --- #
+DEFAULT_DOCUMENT_PART = "word/document.xml"
+OFFICE_DOCUMENT_REL = "/officeDocument"  # _rels/.rels 里主文档关系类型的后缀
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}Relationship"
+_DOCUMENT, _BODY, _TBL, _TR, _TC, _P = (_W + t for t in ("document", "body", "tbl", "tr", "tc", "p"))
+_TR_PR, _GRID_BEFORE = _W + "trPr", _W + "gridBefore"
+_TC_PR, _GRID_SPAN, _V_MERGE = _W + "tcPr", _W + "gridSpan", _W + "vMerge"
+_R, _HYPERLINK, _T = _W + "r", _W + "hyperlink", _W + "t"
+_TAB, _PTAB, _BR, _CR, _NO_BREAK_HYPHEN = (_W + t for t in ("tab", "ptab", "br", "cr", "noBreakHyphen"))
+_VAL, _TYPE = _W + "val", _W + "type"
+
+
+def main_document_part(zf):
+    """根据 _rels/.rels 找到主文档在 zip 包里的路径（个别生成器不叫 word/document.xml）。"""
+    try:
+        rels = ET.fromstring(zf.read("_rels/.rels"))
+    except (KeyError, ET.ParseError):
+        return DEFAULT_DOCUMENT_PART
+    for rel in rels.iter(_REL):
+        if rel.get("Type", "").endswith(OFFICE_DOCUMENT_REL):
+            return rel.get("Target", DEFAULT_DOCUMENT_PART).lstrip("/")
+    return DEFAULT_DOCUMENT_PART
+
+
+def _int_val(elem, default):
+    if elem is None:
+        return default
+    try:
+        return int(elem.get(_VAL))
+    except (TypeError, ValueError):
+        return default
+
+
+def _run_text(r):
+    parts = []
+    for child in r:
+        tag = child.tag
+        if tag == _T:
+            parts.append(child.text or "")
+        elif tag == _TAB or tag == _PTAB:
+            parts.append("\t")
+        elif tag == _CR:
+            parts.append("\n")
+        elif tag == _BR:
+            # 只有普通换行算 "\n"，分页符/分栏符没有文本
+            if child.get(_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == _NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def _paragraph_text(p):
+    parts = []
+    for child in p:
+        if child.tag == _R:
+            parts.append(_run_text(child))
+        elif child.tag == _HYPERLINK:
+            parts.extend(_run_text(r) for r in child.iterfind(_R))
+    return "".join(parts)
+
+
+def cell_text(tc):
+    """单元格文本：直接子段落的文本用换行连接（嵌套表格里的段落不算）。"""
+    return "\n".join(_paragraph_text(p) for p in tc.iterfind(_P))
+
+
+def _row_cells(tr, above):
+    """
+    展开一行，返回 (单元格文本列表, {网格偏移: (文本, 跨列数)})。
+    above 是上一行的 {网格偏移: (文本, 跨列数)}，纵向合并的延续单元格从这里取合并区域顶部的内容。
+    """
+    tr_pr = tr.find(_TR_PR)
+    offset = _int_val(tr_pr.find(_GRID_BEFORE), 0) if tr_pr is not None else 0
+    cells = []
+    roots = {}
+    for tc in tr.iterfind(_TC):
+        tc_pr = tc.find(_TC_PR)
+        span = 1
+        v_merge = None
+        if tc_pr is not None:
+            span = _int_val(tc_pr.find(_GRID_SPAN), 1)
+            v_merge = tc_pr.find(_V_MERGE)
+        if v_merge is not None and v_merge.get(_VAL, "continue") == "continue" and offset in above:
+            root = above[offset]
+        else:
+            # 普通单元格、合并区域的顶部；上一行同一位置没有单元格的异常延续单元格也按普通单元格处理
+            root = (cell_text(tc), span)
+        roots[offset] = root
+        cells.extend([root[0]] * root[1])
+        offset += span
+    return cells, roots
+
+
+def iter_document_tables(stream):
+    """从 document.xml 的字节流中逐个产出顶层表格，每个表格是 list[list[str]]。"""
+    depth = 0
+    body = table = rows = None
+    above = {}
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 2 and elem.tag == _BODY:
+                body = elem
+            elif depth == 3 and elem.tag == _TBL and body is not None:
+                table, rows, above = elem, [], {}
+            continue
+
+        if depth == 4 and table is not None:
+            if elem.tag == _TR:
+                cells, above = _row_cells(elem, above)
+                rows.append(cells)
+            table.remove(elem)
+        elif depth == 3 and body is not None:
+            if elem is table:
+                yield rows
+                table = rows = None
+            body.remove(elem)
+        depth -= 1
+
+
+def iter_tables(source):
+    """
+    惰性地逐个产出 .docx 正文里的表格。
+
+    Args:
+        source (str | Path | file-like): .docx 文件路径或二进制文件对象。
+
+    Yields:
+        list[list[str]]: 一个表格的所有行；每行按布局网格展开，与 python-docx 的
+        [cell.text for cell in row.cells] 相同。
+    """
+    with zipfile.ZipFile(source) as zf:
+        with zf.open(main_document_part(zf)) as stream:
+            yield from iter_document_tables(stream)
+
+
+def read_tables(source):
+    """一次性读取所有表格，返回 list[list[list[str]]]。"""
+    return list(iter_tables(source))
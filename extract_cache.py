@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Word 表单提取结果缓存（提取Word表格写入到Excel.py 使用）
+- 本地 SQLite 旁路文件，按 (文件路径, 模板指纹) 保存每个文件提取出的一行结果
+- 文件大小和修改时间都没变时直接复用；只有修改时间变化时再比对内容哈希，内容没变就只刷新修改时间
+- 模板指纹由各标记的 (表序, 行, 列, 名称) 计算，换模板或改标记后旧结果自然失效
+- 每写入 COMMIT_EVERY 条提交一次，程序中途崩溃时已经提取过的文件不会丢
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from utils import file_sha1
+
+# --- 配置 --- #
+DEFAULT_DB_NAME = ".extract_cache.sqlite"
+EXTRACT_VERSION = 1   # 提取规则（合并单元格取值、文本清理）变化时加一，旧结果自动失效
+COMMIT_EVERY = 100    # 每写入多少条结果提交一次
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    path     TEXT NOT NULL,
+    template TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha1     TEXT NOT NULL,
+    row      TEXT NOT NULL,
+    updated  REAL NOT NULL,
+    PRIMARY KEY (path, template)
+)
+"""
+
+
+def template_fingerprint(marks):
+    """由标记坐标和名称（按顺序）计算模板指纹。"""
+    payload = json.dumps([EXTRACT_VERSION, [(m["table"], m["row"], m["col"], m["name"]) for m in marks]],
+                         ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def file_meta(path):
+    """提取前记录文件状态 (大小, 修改时间, 内容哈希)；解析期间文件被改动时下次会重新提取。"""
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns, file_sha1(path)
+
+
+class ResultCache:
+    """按文件缓存提取结果的 SQLite 数据库；连接只能在创建它的线程里使用。"""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._pending = 0
+
+    @staticmethod
+    def _key(path):
+        return str(os.path.abspath(path))
+
+    def lookup(self, path, template):
+        """返回缓存的结果行；文件不在缓存里、已被修改或已不存在时返回 None。"""
+        key = self._key(path)
+        found = self._conn.execute(
+            "SELECT size, mtime_ns, sha1, row FROM results WHERE path = ? AND template = ?",
+            (key, template)).fetchone()
+        if found is None:
+            return None
+        size, mtime_ns, sha1, row = found
+        try:
+            st = os.stat(path)
+            if st.st_size != size:
+                return None
+            if st.st_mtime_ns != mtime_ns:
+                # 只是被 touch 过或复制过来：内容没变就刷新修改时间，下次不用再算哈希
+                if file_sha1(path) != sha1:
+                    return None
+                self._conn.execute("UPDATE results SET mtime_ns = ? WHERE path = ? AND template = ?",
+                                   (st.st_mtime_ns, key, template))
+                self._changed()
+        except OSError:
+            return None
+        return json.loads(row)
+
+    def store(self, path, template, meta, row):
+        """保存 (或覆盖) 一个文件的结果；meta 为提取前由 file_meta 记录的 (大小, 修改时间, 哈希)。"""
+        size, mtime_ns, sha1 = meta
+        self._conn.execute(
+            "INSERT OR REPLACE INTO results (path, template, size, mtime_ns, sha1, row, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (self._key(path), template, size, mtime_ns, sha1, json.dumps(row, ensure_ascii=False), time.time()))
+        self._changed()
+
+    def prune(self, template, keep_paths):
+        """删除该模板下不在 keep_paths 里的文件（已从目录中移走的表单），返回删除条数。"""
+        keep = {self._key(p) for p in keep_paths}
+        stale = [(path, template) for (path,) in
+                 self._conn.execute("SELECT path FROM results WHERE template = ?", (template,))
+                 if path not in keep]
+        self._conn.executemany("DELETE FROM results WHERE path = ? AND template = ?", stale)
+        self.commit()
+        return len(stale)
+
+    def _changed(self):
+        self._pending += 1
+        if self._pending >= COMMIT_EVERY:
+            self.commit()
+
+    def commit(self):
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self):
+        self.commit()
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
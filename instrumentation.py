@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+可选的耗时/计数统计（各批处理工具共用），默认关闭，关闭时几乎没有开销
+- span("阶段名")：统计一个阶段的次数、总耗时、最短/最长耗时；count("计数名", n)：累加计数
+- session("工具名") / @instrumented("工具名")：一次运行的统计范围，结束时写出 JSON 报告，方便在不同版本之间对比
+- 设置环境变量 WORDTOOLS_REPORT 即可启用：值以 .json 结尾时写到该文件，否则视为目录，每次运行写一个新文件
+- WORDTOOLS_PROFILE=1 同时用 cProfile 采样（报告中列出最耗时的函数，并在报告旁保存 .prof），
+  WORDTOOLS_TRACEMALLOC=1 用 tracemalloc 记录内存峰值和分配最多的代码行
+- 子进程里的统计通过 call_with_spans 带回主进程合并
+- 对比两份报告：python instrumentation.py diff 旧.json 新.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import functools
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+# --- 配置 --- #
+ENV_REPORT = "WORDTOOLS_REPORT"          # 报告文件 (.json) 或目录
+ENV_PROFILE = "WORDTOOLS_PROFILE"        # 为 1 时启用 cProfile
+ENV_TRACEMALLOC = "WORDTOOLS_TRACEMALLOC"  # 为 1 时启用 tracemalloc
+REPORT_VERSION = 1
+PROFILE_TOP = 30                         # 报告中列出的最耗时函数个数
+MEMORY_TOP = 15                          # 报告中列出的分配最多的代码行数
+
+_active = None  # 当前生效的 Recorder；为 None 时 span/count 什么也不做
+
+
+class Recorder:
+    """收集一次运行中的阶段耗时和计数；可以在多个线程里同时使用。"""
+
+    def __init__(self, tool):
+        self.tool = tool
+        self.spans = {}     # 阶段名 -> [次数, 总耗时, 最短, 最长]
+        self.counters = {}  # 计数名 -> 数值
+        self._lock = threading.Lock()
+
+    def add_time(self, name, seconds, calls=1, shortest=None, longest=None):
+        with self._lock:
+            stat = self.spans.get(name)
+            if stat is None:
+                self.spans[name] = [calls, seconds, seconds if shortest is None else shortest,
+                                    seconds if longest is None else longest]
+                return
+            stat[0] += calls
+            stat[1] += seconds
+            stat[2] = min(stat[2], seconds if shortest is None else shortest)
+            stat[3] = max(stat[3], seconds if longest is None else longest)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        """可序列化的统计数据（子进程用它把结果带回主进程）。"""
+        with self._lock:
+            return {"spans": {k: list(v) for k, v in self.spans.items()}, "counters": dict(self.counters)}
+
+    def merge(self, snapshot):
+        for name, (calls, total, shortest, longest) in snapshot["spans"].items():
+            self.add_time(name, total, calls, shortest, longest)
+        for name, n in snapshot["counters"].items():
+            self.count(name, n)
+
+
+def enabled():
+    """是否正在统计；调用方可以据此跳过只为统计而做的额外工作。"""
+    return _active is not None
+
+
+@contextmanager
+def span(name):
+    """统计 with 块的耗时，计入阶段 name；没有启用统计时直接执行。"""
+    recorder = _active
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add_time(name, time.perf_counter() - start)
+
+
+def count(name, n=1):
+    """累加计数 name；没有启用统计时什么也不做。"""
+    recorder = _active
+    if recorder is not None:
+        recorder.count(name, n)
+
+
+def call_with_spans(func, *args):
+    """
+    （子进程）在独立的统计范围里调用 func，返回 (结果, 统计快照)；
+    主进程用 merge_child 把快照合并到当前运行的报告里。
+    """
+    global _active
+    previous, _active = _active, Recorder("child")
+    try:
+        return func(*args), _active.snapshot()
+    finally:
+        _active = previous
+
+
+def merge_child(outcome):
+    """拆开 call_with_spans 的返回值：合并统计快照，返回函数结果。"""
+    result, snapshot = outcome
+    if _active is not None:
+        _active.merge(snapshot)
+    return result
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _report_path(target, tool):
+    if target.lower().endswith(".json"):
+        return target
+    os.makedirs(target, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")  # 同一秒内的多次运行也不会互相覆盖
+    return os.path.join(target, f"{tool}-{stamp}-{os.getpid()}.json")
+
+
+def _profile_summary(profiler, report_path):
+    import pstats
+    prof_path = os.path.splitext(report_path)[0] + ".prof"
+    profiler.dump_stats(prof_path)
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({"function": f"{os.path.basename(filename)}:{line}({func})", "ncalls": ncalls,
+                     "tottime": round(tottime, 6), "cumtime": round(cumtime, 6)})
+    rows.sort(key=lambda r: r["cumtime"], reverse=True)
+    return {"stats_file": prof_path, "top_cumulative": rows[:PROFILE_TOP]}
+
+
+def _memory_summary(tracemalloc):
+    current, peak = tracemalloc.get_traced_memory()
+    top = tracemalloc.take_snapshot().statistics("lineno")[:MEMORY_TOP]
+    return {"current_bytes": current, "peak_bytes": peak,
+            "top_lines": [{"where": f"{s.traceback[0].filename}:{s.traceback[0].lineno}", "bytes": s.size,
+                           "blocks": s.count} for s in top]}
+
+
+@contextmanager
+def session(tool, report=None, profile=None, trace_memory=None):
+    """
+    一次运行的统计范围。report 为报告路径（.json 文件或目录），默认取环境变量 WORDTOOLS_REPORT；
+    两者都没有时不做任何统计。已经在统计中时直接沿用外层的范围（嵌套调用不会重复写报告）。
+    """
+    global _active
+    report = report or os.environ.get(ENV_REPORT)
+    if _active is not None or not report:
+        yield _active
+        return
+    profile = _env_flag(ENV_PROFILE) if profile is None else profile
+    trace_memory = _env_flag(ENV_TRACEMALLOC) if trace_memory is None else trace_memory
+
+    recorder = Recorder(tool)
+    profiler = None
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+    if profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    started = time.time()
+    start = time.perf_counter()
+    _active = recorder
+    status = "ok"
+    try:
+        yield recorder
+    except BaseException as e:
+        status = f"error: {type(e).__name__}"
+        raise
+    finally:
+        _active = None
+        wall = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+        path = _report_path(report, tool)
+        data = {
+            "version": REPORT_VERSION,
+            "tool": tool,
+            "status": status,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+            "wall_seconds": round(wall, 6),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "argv": sys.argv,
+            "spans": {name: {"calls": calls, "total": round(total, 6), "mean": round(total / calls, 6),
+                             "min": round(shortest, 6), "max": round(longest, 6)}
+                      for name, (calls, total, shortest, longest) in sorted(recorder.spans.items())},
+            "counters": dict(sorted(recorder.counters.items())),
+        }
+        if profiler is not None:
+            data["profile"] = _profile_summary(profiler, path)
+        if trace_memory:
+            import tracemalloc
+            data["memory"] = _memory_summary(tracemalloc)
+            tracemalloc.stop()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"性能报告已写入：{path}", file=sys.stderr)
+
+
+def instrumented(tool):
+    """装饰器：在 session(tool) 里运行被装饰的函数（入口函数用它接入统计）。"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with session(tool):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# --- 报告对比 --- #
+def diff_reports(old, new):
+    """返回 [(类别, 名称, 旧值, 新值)]：各阶段的总耗时和各计数，两份报告任一份里有的都列出。"""
+    rows = [("wall", "wall_seconds", old.get("wall_seconds"), new.get("wall_seconds"))]
+    for name in sorted(set(old.get("spans", {})) | set(new.get("spans", {}))):
+        rows.append(("span", name, old.get("spans", {}).get(name, {}).get("total"),
+                     new.get("spans", {}).get(name, {}).get("total")))
+    for name in sorted(set(old.get("counters", {})) | set(new.get("counters", {}))):
+        rows.append(("counter", name, old.get("counters", {}).get(name), new.get("counters", {}).get(name)))
+    return rows
+
+
+def _fmt_value(kind, value):
+    if value is None:
+        return "-"
+    return str(value) if kind == "counter" else f"{value:.4f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="性能报告工具")
+    sub = parser.add_subparsers(dest="command", required=True)
+    diff = sub.add_parser("diff", help="对比两份 JSON 报告的阶段耗时和计数")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    args = parser.parse_args(argv)
+
+    with open(args.old, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(args.new, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"{'类别':<8}{'名称':<36}{'旧':>12}{'新':>12}{'变化':>10}")
+    for kind, name, before, after in diff_reports(old, new):
+        change = f"{(after - before) / before * 100:+.1f}%" if before and after is not None else ""
+        print(f"{kind:<8}{name:<36}{_fmt_value(kind, before):>12}{_fmt_value(kind, after):>12}{change:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,86 @@
+import io
 import os
-import tkinter as tk
-from tkinter import filedialog, messagebox
+import csv
+import sys
+import codecs
+import glob
+import time
+import argparse
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import instrumentation
 
-# 可选依赖：处理 Excel/CSV
-try:
-    import pandas as pd
-except Exception:
-    pd = None
+SUPPORTED_EXTS = {'.txt', '.csv', '.xlsx', '.xls'}  # 批量模式处理的文件类型
+OUTPUT_SUFFIX = "_no_phonetics"                      # 输出文件名后缀（与界面默认一致）
+SNIFF_BYTES = 64 * 1024                              # 编码探测只读取文件开头这么多字节
+ENCODING_CANDIDATES = [
+    'utf-8',
+    'gb18030', 'gbk', 'big5',
+    'shift_jis', 'cp932',
+    'windows-1252', 'iso-8859-1'
+]
+STREAM_THRESHOLD = 256 * 1024 * 1024                # 输入超过该大小且输出不是 Excel 时自动流式处理
+STREAM_BATCH_ROWS = 10_000                           # 流式处理时每批写出的行数
+# CSV 单元格一律按原文读取（不推断数值、空单元格读成空字符串），与流式处理的输出一致：007、1.50 原样保留
+CSV_TEXT_OPTIONS = dict(dtype=str, keep_default_na=False)
+_BOMS = [  # UTF-32 LE 的 BOM 以 UTF-16 LE 的 BOM 开头，必须先检查
+    (codecs.BOM_UTF32_LE, 'utf-32'), (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# 可选依赖：处理 Excel/CSV（按需导入，避免拖慢窗口启动）
+def _load_pandas():
+    try:
+        import pandas as pd
+    except Exception:
+        return None
+    return pd
 
 
-def _read_text_with_guess(path: str) -> str:
-    encodings = [
-        'utf-8', 'utf-8-sig',
-        'gb18030', 'gbk', 'big5',
-        'shift_jis', 'cp932',
-        'windows-1252', 'iso-8859-1'
-    ]
+def detect_encoding(path, sample_size=SNIFF_BYTES):
+    """
+    只读取文件开头 sample_size 字节来判断编码：
+    - 先看 BOM（UTF-8/UTF-16/UTF-32）
+    - 再按 ENCODING_CANDIDATES 的顺序用增量解码器试解样本，样本末尾被截断的多字节字符不算错误
+    """
     with open(path, 'rb') as f:
-        raw = f.read()
-    for enc in encodings:
+        sample = f.read(sample_size)
+        at_eof = not f.read(1)
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+    for encoding in ENCODING_CANDIDATES:
         try:
-            return raw.decode(enc)
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=at_eof)
         except UnicodeDecodeError:
             continue
+        return encoding
+    return 'iso-8859-1'  # 单字节编码，任何字节都能解码
+
+
+def read_text(path, encoding=None):
+    """
+    读取整个文本文件并只解码一次，返回 (文本, 实际使用的编码)。
+    指定 encoding 时不做探测，解码失败直接抛出异常。
+    """
+    explicit = encoding is not None
+    encoding = encoding or detect_encoding(path)
+    with open(path, 'rb') as f:
+        raw = f.read()
     try:
-        return raw.decode('utf-8', errors='strict')
+        return raw.decode(encoding), encoding
     except UnicodeDecodeError:
-        return raw.decode('latin-1', errors='replace')
+        if explicit:
+            raise
+    # 少见情况：非法字节出现在样本之后，从候选列表里接着往后试
+    later = ENCODING_CANDIDATES[ENCODING_CANDIDATES.index(encoding) + 1:] if encoding in ENCODING_CANDIDATES else []
+    for candidate in later:
+        try:
+            return raw.decode(candidate), candidate
+        except UnicodeDecodeError:
+            continue
+    return raw.decode(encoding, errors='replace'), encoding
 
 
 def _write_text_utf8(path: str, text: str):
@@ -43,80 +96,337 @@ def _remove_between_slashes(text: str) -> str:
         return text[:start_index] + text[end_index + 1:]
     return text
 
+def remove_phonetics_from_frame(df):
+    """
+    按列去掉被斜杠包围的内容，结果与逐单元格调用 _remove_between_slashes 完全一致：
+    - 只处理文本列（字符串列、混有字符串的 object 列），数值/日期/布尔列直接跳过
+    - 每列先用 pd.factorize 在 C 里对取值去重，每个不同的字符串只处理一次再按编码回填；
+      导出的单词表大量重复（词性、单元名、同一个单词），比逐单元格调用快得多
+    - 非字符串单元格和空值原样保留
+    """
+    pd = _load_pandas()
+    import numpy as np
+    df = df.copy()
+    for i in range(df.shape[1]):
+        column = df.iloc[:, i]
+        if not (column.dtype == object or isinstance(column.dtype, pd.StringDtype)):
+            continue
+        codes, uniques = pd.factorize(column, use_na_sentinel=True)
+        is_text = np.fromiter((isinstance(v, str) for v in uniques), dtype=bool, count=len(uniques))
+        if not is_text.any():
+            continue
+        cleaned = np.array([_remove_between_slashes(v) for v in uniques], dtype=object)
+        values = column.to_numpy(dtype=object, copy=True)
+        mask = (codes >= 0) & np.append(is_text, False)[codes]
+        values[mask] = cleaned[codes[mask]]
+        df.isetitem(i, pd.Series(values, index=column.index, name=column.name, dtype=column.dtype))
+    return df
+
+
+# ----------------- 流式处理（大文件） -----------------
+def _can_stream(ext_in, ext_out):
+    """只有 TXT/CSV 输入、且输出不是 Excel 时才能边读边写。"""
+    return ext_in in {'.txt', '.csv'} and ext_out not in {'.xlsx', '.xls'}
+
 
-def remove_phonetics_from_file(input_file, output_file):
+def _stream_text(src, dst, ext_out):
+    """TXT 输入：逐行读取、清理、原样写出（与整表模式相同，输出为 .csv 时也不加表头）。"""
+    rows = 0
+    for line in src:
+        dst.write(_remove_between_slashes(line))
+        rows += 1
+    return rows
+
+
+def _stream_csv(src, dst, ext_out):
+    """
+    CSV 输入：用 csv 模块逐行读取（支持引号内换行和列数不一致的行），按批写出。
+    表头原样保留，单元格文本不做类型转换，空行跳过；输出 TXT 时与整表模式一样不写表头、
+    用逗号连接、最后一行后面没有换行。
+    """
+    reader = csv.reader(src)
+    header = next(reader, None)
+    if header is None:
+        return 0
+    to_csv = ext_out == '.csv'
+    writer = csv.writer(dst, lineterminator=os.linesep) if to_csv else None
+    if to_csv:
+        writer.writerow(header)
+    rows = 0
+    batch = []
+    for row in reader:
+        if not row:
+            continue  # 与 pandas.read_csv 一样跳过空行
+        batch.append([_remove_between_slashes(cell) for cell in row])
+        if len(batch) >= STREAM_BATCH_ROWS:
+            rows += _flush_rows(batch, writer, dst, rows)
+    return rows + _flush_rows(batch, writer, dst, rows)
+
+
+def _flush_rows(batch, writer, dst, written):
+    """写出一批行；written 为之前已写出的行数（TXT 输出用换行分隔各行，最后一行后面不加换行）。"""
+    count = len(batch)
+    if writer is not None:
+        writer.writerows(batch)
+    elif batch:
+        dst.write(('\n' if written else '') + '\n'.join(','.join(row) for row in batch))
+    batch.clear()
+    return count
+
+
+def stream_clean_file(input_file, output_file, encoding=None):
+    """
+    流式处理 TXT/CSV：按行读取、清理并立即写出，峰值内存与文件大小无关。
+
+    Returns:
+        (int, str): 处理的行数和使用的编码。
     """
-    根据扩展名自动处理 TXT/CSV/Excel：
-    - TXT/CSV：逐行/逐列去掉被斜杠包围的内容
+    in_path = Path(input_file)
+    out_path = Path(output_file)
+    ext_in = in_path.suffix.lower()
+    ext_out = out_path.suffix.lower()
+    if not _can_stream(ext_in, ext_out):
+        raise ValueError("流式模式只支持 TXT/CSV 输入和 TXT/CSV 输出")
+    process = _stream_csv if ext_in == '.csv' else _stream_text
+    # 与整表模式一致：CSV 输入写成 CSV 时带 BOM，其余情况（含 TXT 输入）为不带 BOM 的 UTF-8
+    out_encoding = 'utf-8-sig' if ext_in == '.csv' and ext_out == '.csv' else 'utf-8'
+
+    if encoding:
+        candidates = [encoding]
+    else:
+        # 非法字节出现在探测样本之后时，从候选列表里接着往后试（重新写出整个文件）
+        detected = detect_encoding(str(in_path))
+        later = ENCODING_CANDIDATES[ENCODING_CANDIDATES.index(detected) + 1:] if detected in ENCODING_CANDIDATES else []
+        candidates = [detected] + later
+    for i, candidate in enumerate(candidates):
+        try:
+            with open(in_path, 'r', encoding=candidate, newline='') as src, \
+                    open(out_path, 'w', encoding=out_encoding, newline='') as dst:
+                return process(src, dst, ext_out), candidate
+        except UnicodeDecodeError:
+            if i == len(candidates) - 1:
+                raise
+
+
+def clean_file(input_file, output_file, encoding=None, stream=None):
+    """
+    根据扩展名自动处理 TXT/CSV/Excel（不弹窗，出错时直接抛出异常）：
+    - TXT/CSV：逐行/逐列去掉被斜杠包围的内容；编码只根据文件开头探测一次（可用 encoding 指定）
     - XLSX/XLS：逐单元格处理，并以正确的 Excel 格式写出
+    - stream=True 时 TXT/CSV 改用 stream_clean_file 边读边写（Excel 仍按整表处理）；
+      默认 None 表示输入超过 STREAM_THRESHOLD 时自动启用
+
+    Returns:
+        (int, str | None): 处理的行数，以及读取 TXT/CSV 时使用的编码（Excel 为 None）。
     """
-    try:
-        in_path = Path(input_file)
-        out_path = Path(output_file)
-        ext_in = in_path.suffix.lower()
-        ext_out = out_path.suffix.lower()
-
-        # 优先走 pandas 分支处理结构化文件
-        if ext_in in {'.xlsx', '.xls', '.csv'} or ext_out in {'.xlsx', '.xls'}:
-            if pd is None:
-                raise RuntimeError("需要 pandas 才能读写 Excel/CSV，请先安装：pip install pandas openpyxl")
-
-            # 读取
-            if ext_in in {'.xlsx', '.xls'}:
-                df = pd.read_excel(in_path)
-            elif ext_in == '.csv':
-                # 尝试常见编码
-                for enc in ['utf-8', 'utf-8-sig', 'gb18030', 'gbk']:
-                    try:
-                        df = pd.read_csv(in_path, encoding=enc)
-                        break
-                    except Exception:
-                        df = None
-                if df is None:
-                    # 回退二进制读 + 手动解码
-                    content = _read_text_with_guess(str(in_path))
-                    lines = content.splitlines()
-                    rows = [line.split(',') for line in lines]
-                    df = pd.DataFrame(rows)
-            else:
-                # 对 txt 也支持表格导出
-                content = _read_text_with_guess(str(in_path))
-                lines = content.splitlines()
-                df = pd.DataFrame({'text': lines})
-
-            # 逐元素处理（仅对字符串）
-            df = df.applymap(_remove_between_slashes)
-
-            # 写出
-            if ext_out in {'.xlsx', '.xls'}:
-                engine = 'openpyxl' if ext_out == '.xlsx' else None
-                with pd.ExcelWriter(out_path, engine=engine) as writer:
-                    df.to_excel(writer, index=False)
-            elif ext_out == '.csv':
-                df.to_csv(out_path, index=False, encoding='utf-8-sig')
-            else:
-                # 写纯文本（按行合成）
-                if df.shape[1] == 1:
-                    text = '\n'.join(str(v) for v in df.iloc[:, 0].tolist())
-                else:
-                    text = '\n'.join(','.join(map(str, row)) for row in df.values.tolist())
-                _write_text_utf8(str(out_path), text)
-        else:
-            # 普通文本文件逐行处理
-            content = _read_text_with_guess(str(in_path))
+    in_path = Path(input_file)
+    out_path = Path(output_file)
+    ext_in = in_path.suffix.lower()
+    ext_out = out_path.suffix.lower()
+    override = encoding
+
+    if stream is None:
+        stream = in_path.stat().st_size >= STREAM_THRESHOLD
+    if stream and _can_stream(ext_in, ext_out):
+        with instrumentation.span("phonetics.stream"):
+            row_count, encoding = stream_clean_file(in_path, out_path, encoding)
+    # 优先走 pandas 分支处理结构化文件
+    elif ext_in in {'.xlsx', '.xls', '.csv'} or ext_out in {'.xlsx', '.xls'}:
+        pd = _load_pandas()
+        if pd is None:
+            raise RuntimeError("需要 pandas 才能读写 Excel/CSV，请先安装：pip install pandas openpyxl")
+
+        with instrumentation.span("phonetics.read"):
+            df, encoding = _read_frame(pd, in_path, ext_in, override)
+
+        # 按列向量化处理（仅对文本列）
+        with instrumentation.span("phonetics.clean"):
+            df = remove_phonetics_from_frame(df)
+        row_count = len(df)
+        instrumentation.count("phonetics.cells", df.size)
+
+        with instrumentation.span("phonetics.write"):
+            _write_frame(df, out_path, ext_out)
+    else:
+        # 普通文本文件逐行处理
+        with instrumentation.span("phonetics.read"):
+            content, encoding = read_text(str(in_path), override)
+        with instrumentation.span("phonetics.clean"):
             lines = content.splitlines(keepends=True)
             new_lines = [_remove_between_slashes(line) for line in lines]
+        with instrumentation.span("phonetics.write"):
             _write_text_utf8(str(out_path), ''.join(new_lines))
+        row_count = len(lines)
+    instrumentation.count("phonetics.files")
+    instrumentation.count("phonetics.rows", row_count)
+    return row_count, encoding
+
+
+def _read_frame(pd, in_path, ext_in, override):
+    """clean_file 的读取部分：返回 (DataFrame, 使用的编码)，Excel 的编码为 None。"""
+    if ext_in in {'.xlsx', '.xls'}:
+        return pd.read_excel(in_path), None
+    if ext_in != '.csv':
+        # 对 txt 也支持表格导出
+        content, encoding = read_text(str(in_path), override)
+        return pd.DataFrame({'text': content.splitlines()}), encoding
+
+    encoding = override or detect_encoding(str(in_path))
+    try:
+        return pd.read_csv(in_path, encoding=encoding, **CSV_TEXT_OPTIONS), encoding
+    except UnicodeDecodeError:
+        if override:
+            raise
+    except (pd.errors.ParserError, pd.errors.EmptyDataError):
+        pass
+    # 回退：样本之后才出现非法字节，或各行列数不一致；解码一次后再解析，仍失败就按逗号手动切分
+    content, encoding = read_text(str(in_path), override)
+    try:
+        return pd.read_csv(io.StringIO(content), **CSV_TEXT_OPTIONS), encoding
+    except (pd.errors.ParserError, pd.errors.EmptyDataError):
+        rows = [line.split(',') for line in content.splitlines()]
+        return pd.DataFrame(rows), encoding
+
 
-        messagebox.showinfo("成功", f"文件处理完成！已保存到：\n{output_file}")
+def _write_frame(df, out_path, ext_out):
+    """clean_file 的写出部分：按输出扩展名写 Excel / CSV / 纯文本。"""
+    if ext_out in {'.xlsx', '.xls'}:
+        pd = _load_pandas()
+        engine = 'openpyxl' if ext_out == '.xlsx' else None
+        with pd.ExcelWriter(out_path, engine=engine) as writer:
+            df.to_excel(writer, index=False)
+    elif ext_out == '.csv':
+        df.to_csv(out_path, index=False, encoding='utf-8-sig')
+    else:
+        # 写纯文本（按行合成）
+        if df.shape[1] == 1:
+            text = '\n'.join(str(v) for v in df.iloc[:, 0].tolist())
+        else:
+            text = '\n'.join(','.join(map(str, row)) for row in df.values.tolist())
+        _write_text_utf8(str(out_path), text)
+
+
+@instrumentation.instrumented("phonetics")
+def remove_phonetics_from_file(input_file, output_file, encoding=None):
+    """界面入口：处理单个文件并弹窗提示结果（含识别出的编码）。"""
+    from tkinter import messagebox
+    try:
+        _, used_encoding = clean_file(input_file, output_file, encoding)
+        note = f"\n（读取编码：{used_encoding}）" if used_encoding else ""
+        messagebox.showinfo("成功", f"文件处理完成！已保存到：\n{output_file}{note}")
     except Exception as e:
         messagebox.showerror("错误", f"处理文件时发生错误：\n{e}")
 
-class App(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("音标去除工具")
-        self.geometry("450x200")
+# ----------------- 命令行批量模式 -----------------
+def collect_batch_inputs(target):
+    """
+    展开目录或通配符，返回 (根目录, 待处理文件列表)。
+    已经是处理结果（文件名以 _no_phonetics 结尾）的文件会被跳过。
+    """
+    path = Path(target)
+    if path.is_dir():
+        root = path
+        candidates = path.rglob('*')
+    else:
+        candidates = (Path(p) for p in glob.glob(target, recursive=True))
+        root = None
+    files = sorted(p for p in candidates
+                   if p.is_file() and p.suffix.lower() in SUPPORTED_EXTS and not p.stem.endswith(OUTPUT_SUFFIX))
+    if root is None:
+        root = Path(os.path.commonpath([str(p.parent) for p in files])) if files else Path('.')
+    return root, files
+
+
+def batch_output_path(input_path, root, out_dir=None, ext=None):
+    """计算输出路径：默认与输入同目录；指定 out_dir 时按相对路径镜像到该目录。"""
+    name = f"{input_path.stem}{OUTPUT_SUFFIX}{ext or input_path.suffix}"
+    if out_dir is None:
+        return input_path.with_name(name)
+    return Path(out_dir) / input_path.parent.relative_to(root) / name
+
+
+def _batch_worker(input_file, output_file, encoding=None, stream=None):
+    """（子进程）处理一个文件，返回 (输入, 输出, 行数, 编码, 耗时, 错误信息)。"""
+    start = time.perf_counter()
+    try:
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        rows, used_encoding = clean_file(input_file, output_file, encoding, stream)
+        return input_file, output_file, rows, used_encoding, time.perf_counter() - start, None
+    except Exception as e:
+        return input_file, output_file, 0, None, time.perf_counter() - start, str(e) or type(e).__name__
+
+
+@instrumentation.instrumented("phonetics-batch")
+def run_batch(target, out_dir=None, ext=None, jobs=None, encoding=None, stream=None):
+    """多进程批量处理，结束后打印每个文件的耗时和行数汇总。返回失败文件数。"""
+    root, files = collect_batch_inputs(target)
+    if not files:
+        print(f"没有找到可处理的文件：{target}")
+        return 0
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(files)))
+    print(f"共 {len(files)} 个文件，使用 {jobs} 个进程处理...")
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # 启用了性能统计时，子进程里的阶段耗时随结果一起带回来
+        traced = instrumentation.enabled()
+        futures = [pool.submit(instrumentation.call_with_spans, _batch_worker, *task) if traced
+                   else pool.submit(_batch_worker, *task)
+                   for task in ((str(f), str(batch_output_path(f, root, out_dir, ext)), encoding, stream)
+                                for f in files)]
+        for done, future in enumerate(as_completed(futures), 1):
+            results.append(instrumentation.merge_child(future.result()) if traced else future.result())
+            print(f"\r进度：{done}/{len(files)}", end="", flush=True)
+    elapsed = time.perf_counter() - start
+    print()
+
+    results.sort(key=lambda r: r[0])
+    failed = 0
+    total_rows = 0
+    print(f"{'耗时(秒)':>10}{'行数':>10}  {'编码':<12}文件")
+    for input_file, output_file, rows, used_encoding, seconds, error in results:
+        if error:
+            failed += 1
+            print(f"{seconds:>10.3f}{'失败':>10}  {'':<12}{input_file}：{error}")
+        else:
+            total_rows += rows
+            print(f"{seconds:>10.3f}{rows:>10}  {used_encoding or '-':<12}{input_file} -> {output_file}")
+    print(f"完成：成功 {len(results) - failed} 个，失败 {failed} 个，共 {total_rows} 行，"
+          f"总耗时 {elapsed:.2f} 秒（{len(results) / elapsed if elapsed > 0 else 0:.1f} 个文件/秒）。")
+    return failed
+
+
+def _encoding_arg(value):
+    try:
+        return codecs.lookup(value).name
+    except LookupError:
+        raise argparse.ArgumentTypeError(f"未知的编码：{value}") from None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="音标去除工具：不带参数时打开图形界面，带 --batch 时在命令行批量处理。")
+    parser.add_argument("--batch", metavar="目录或通配符",
+                        help="批量处理目录（递归）或通配符匹配到的 TXT/CSV/XLSX 文件，如 'exports/**/*.xlsx'")
+    parser.add_argument("--out-dir", help="输出到该目录并保持原有的子目录结构（默认写在输入文件旁边）")
+    parser.add_argument("--to", choices=["txt", "csv", "xlsx"], help="统一转换为该格式（默认保持原格式）")
+    parser.add_argument("--jobs", type=int, help="进程数（默认等于 CPU 核数）")
+    parser.add_argument("--encoding", type=_encoding_arg,
+                        help="TXT/CSV 的输入编码，如 gbk（默认根据文件开头自动探测）")
+    parser.add_argument("--stream", action="store_true",
+                        help="TXT/CSV 一律逐行流式处理，内存占用与文件大小无关（默认只对超过 256MB 的文件启用；Excel 不受影响）")
+    return parser.parse_args(argv)
+
+
+# ----------------- 图形界面 -----------------
+class App:
+    def __init__(self, root):
+        import tkinter as tk
+        from tkinter import filedialog, messagebox
+        self.tk, self.filedialog, self.messagebox = tk, filedialog, messagebox
+        self.root = root
+        root.title("音标去除工具")
+        root.geometry("450x240")
         
         self.input_file_path = ""
         self.output_file_path = ""
@@ -125,35 +435,46 @@ class App(tk.Tk):
 
     def create_widgets(self):
         # 1. 选取文件区域
-        frame_input = tk.Frame(self, pady=10)
+        frame_input = self.tk.Frame(self.root, pady=10)
         frame_input.pack(fill="x", padx=10)
         
-        tk.Label(frame_input, text="选择源文件:").pack(side="left")
+        self.tk.Label(frame_input, text="选择源文件:").pack(side="left")
         
-        self.entry_input = tk.Entry(frame_input, width=30)
+        self.entry_input = self.tk.Entry(frame_input, width=30)
         self.entry_input.pack(side="left", padx=5, expand=True)
         
-        tk.Button(frame_input, text="浏览...", command=self.select_input_file).pack(side="left")
+        self.tk.Button(frame_input, text="浏览...", command=self.select_input_file).pack(side="left")
 
         # 2. 保存路径区域
-        frame_output = tk.Frame(self, pady=10)
+        frame_output = self.tk.Frame(self.root, pady=10)
         frame_output.pack(fill="x", padx=10)
         
-        tk.Label(frame_output, text="选择保存路径:").pack(side="left")
+        self.tk.Label(frame_output, text="选择保存路径:").pack(side="left")
         
-        self.entry_output = tk.Entry(frame_output, width=30)
+        self.entry_output = self.tk.Entry(frame_output, width=30)
         self.entry_output.pack(side="left", padx=5, expand=True)
         
-        tk.Button(frame_output, text="保存为...", command=self.select_output_file).pack(side="left")
+        self.tk.Button(frame_output, text="保存为...", command=self.select_output_file).pack(side="left")
+
+        # 3. 编码（留空则自动探测，仅对 TXT/CSV 有效）
+        frame_encoding = self.tk.Frame(self.root)
+        frame_encoding.pack(fill="x", padx=10)
 
-        # 3. 开始按钮
-        frame_start = tk.Frame(self, pady=20)
+        self.tk.Label(frame_encoding, text="文件编码:").pack(side="left")
+
+        self.entry_encoding = self.tk.Entry(frame_encoding, width=12)
+        self.entry_encoding.pack(side="left", padx=5)
+
+        self.tk.Label(frame_encoding, text="留空自动识别，如 gbk / utf-8").pack(side="left")
+
+        # 4. 开始按钮
+        frame_start = self.tk.Frame(self.root, pady=20)
         frame_start.pack()
         
-        tk.Button(frame_start, text="开始处理", font=("Arial", 12, "bold"), command=self.start_process).pack()
+        self.tk.Button(frame_start, text="开始处理", font=("Arial", 12, "bold"), command=self.start_process).pack()
 
     def select_input_file(self):
-        file_path = filedialog.askopenfilename(
+        file_path = self.filedialog.askopenfilename(
             title="选择要处理的文本文件",
             filetypes=[
                 ("Excel 文件", "*.xlsx *.xls"),
@@ -164,18 +485,18 @@ class App(tk.Tk):
         )
         if file_path:
             self.input_file_path = file_path
-            self.entry_input.delete(0, tk.END)
+            self.entry_input.delete(0, self.tk.END)
             self.entry_input.insert(0, file_path)
             
             # 根据输入文件自动生成输出文件名
             dir_name, file_name = os.path.split(file_path)
             name, ext = os.path.splitext(file_name)
             self.output_file_path = os.path.join(dir_name, f"{name}_no_phonetics{ext}")
-            self.entry_output.delete(0, tk.END)
+            self.entry_output.delete(0, self.tk.END)
             self.entry_output.insert(0, self.output_file_path)
 
     def select_output_file(self):
-        file_path = filedialog.asksaveasfilename(
+        file_path = self.filedialog.asksaveasfilename(
             title="选择保存位置和文件名",
             defaultextension=".xlsx",
             filetypes=[
@@ -187,19 +508,37 @@ class App(tk.Tk):
         )
         if file_path:
             self.output_file_path = file_path
-            self.entry_output.delete(0, tk.END)
+            self.entry_output.delete(0, self.tk.END)
             self.entry_output.insert(0, file_path)
 
     def start_process(self):
         if not self.input_file_path:
-            messagebox.showwarning("警告", "请先选择一个源文件！")
+            self.messagebox.showwarning("警告", "请先选择一个源文件！")
             return
         if not self.output_file_path:
-            messagebox.showwarning("警告", "请选择一个保存路径！")
+            self.messagebox.showwarning("警告", "请选择一个保存路径！")
             return
+        encoding = self.entry_encoding.get().strip() or None
+        if encoding:
+            try:
+                encoding = codecs.lookup(encoding).name
+            except LookupError:
+                self.messagebox.showwarning("警告", f"未知的编码：{encoding}")
+                return
             
-        remove_phonetics_from_file(self.input_file_path, self.output_file_path)
+        remove_phonetics_from_file(self.input_file_path, self.output_file_path, encoding)
+
+
+def main_gui():
+    import tkinter as tk
+    root = tk.Tk()
+    App(root)
+    root.mainloop()
 
 if __name__ == "__main__":
-    app = App()
-    app.mainloop()
+    args = parse_args()
+    if args.batch:
+        ext = f".{args.to}" if args.to else None
+        sys.exit(1 if run_batch(args.batch, out_dir=args.out_dir, ext=ext, jobs=args.jobs,
+                                encoding=args.encoding, stream=args.stream or None) else 0)
+    main_gui()
@@ -1,8 +1,40 @@
-﻿import json
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
-from docx import Document
-import openpyxl
+﻿import os
+import sys
+import html
+import glob
+import json
+import time
+import argparse
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from docx_tables import iter_tables
+from table_sinks import XlsxSink, atomic_write
+
+
+# --- 表格筛选 ---
+def _index_selector(tables):
+    """把 tables 参数（int / range / slice / 序号列表）转为 (判断函数, 最大序号)；最大序号为 None 表示没有上限。"""
+    if tables is None:
+        return None, None
+    if isinstance(tables, int):
+        tables = [tables]
+    elif isinstance(tables, slice):
+        start, stop, step = tables.start or 0, tables.stop, tables.step or 1
+        if start < 0 or (stop is not None and stop < 0) or step < 0:
+            raise ValueError("表格切片不支持负数（需要先解析完整个文档才能确定位置）")
+        if stop is None:
+            return (lambda i: i >= start and (i - start) % step == 0), None
+        tables = range(start, stop, step)
+    wanted = set(tables)
+    if any(i < 0 for i in wanted):
+        raise ValueError("表格序号不能为负数（需要先解析完整个文档才能确定位置）")
+    return wanted.__contains__, max(wanted, default=-1)
+
+
+def header_contains(text):
+    """iter_tables 的 where 条件：表头（第一行）有单元格包含 text（不区分大小写）。"""
+    needle = text.casefold()
+    return lambda table: bool(table) and any(needle in cell.casefold() for cell in table[0])
 
 
 # --- WordTableParser Class ---
@@ -11,101 +43,272 @@ class WordTableParser:
         self.filepath = filepath
         self.document = None
         self.tables = []
+        self._extracted = False  # 调用过 extract_tables 后 save_as_* 只写出 self.tables（即使筛选结果为空）
 
     def load_document(self) -> None:
         """加载 Word 文件"""
+        from docx import Document  # 延迟导入：窗口先出现，转换时再加载 python-docx
         self.document = Document(self.filepath)
 
-    def extract_tables(self):
-        """提取所有表格，转换为二维数组"""
-        if self.document is None:
-            self.load_document()
+    def iter_tables(self, tables=None, where=None, limit=None):
+        """
+        惰性地逐个产出表格（二维数组，单元格文本已去除首尾空白；直接流式解析 document.xml）。
 
-        self.tables = []
-        for table in self.document.tables:
-            parsed_table = []
-            for row in table.rows:
-                parsed_row = [cell.text.strip() for cell in row.cells]
-                parsed_table.append(parsed_row)
-            self.tables.append(parsed_table)
+        Args:
+            tables: 只要这些序号的表格（从 0 开始），可以是 int、range、slice 或序号列表。
+            where: 判断函数，接收表格、返回是否要这个表格，如 header_contains("Word")。
+            limit: 最多产出多少个表格。
+
+        选中的序号都已经过去、或已经产出 limit 个表格时立即停止解析，文档后面的部分不再读取：
+        从很长的讲义里只取一个词汇表，耗时只与它前面的内容有关。
+        """
+        wanted, last = _index_selector(tables)
+        if (last is not None and last < 0) or (limit is not None and limit <= 0):
+            return
+        produced = 0
+        for idx, raw in enumerate(iter_tables(self.filepath)):
+            if wanted is not None:
+                if last is not None and idx > last:
+                    return
+                if not wanted(idx):
+                    continue
+            table = [[cell.strip() for cell in row] for row in raw]
+            if where is not None and not where(table):
+                continue
+            yield table
+            produced += 1
+            if produced == limit:
+                return
+
+    def extract_tables(self, tables=None, where=None, limit=None):
+        """提取表格保存到 self.tables（筛选参数同 iter_tables），之后的 save_as_* 只写出这些表格。"""
+        self.tables = list(self.iter_tables(tables, where, limit))
+        self._extracted = True
         return self.tables
 
-    def save_as_json(self, output_path: str) -> None:
-        if not self.tables:
-            self.extract_tables()
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(self.tables, f, ensure_ascii=False, indent=2)
-
-    def save_as_excel(self, output_path: str) -> None:
-        if not self.tables:
-            self.extract_tables()
-        wb = openpyxl.Workbook()
-        wb.remove(wb.active)
-        for idx, table in enumerate(self.tables, start=1):
-            ws = wb.create_sheet(f"Table{idx}")
-            for row in table:
-                ws.append(row)
-        wb.save(output_path)
-
-    def save_as_html(self, output_path: str) -> None:
-        if not self.tables:
-            self.extract_tables()
-
-        html_content = "<html><head><meta charset='utf-8'></head><body>\n"
-        for idx, table in enumerate(self.tables, start=1):
-            html_content += f"<h3>Table {idx}</h3>\n<table border='1' cellspacing='0' cellpadding='5'>\n"
-            for row in table:
-                html_content += "<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>\n"
-            html_content += "</table><br>\n"
-        html_content += "</body></html>"
-
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+    def _parsed_tables(self):
+        """已提取过就复用 self.tables，否则边解析边逐个产出。"""
+        if self._extracted:
+            yield from self.tables
+            return
+        yield from self.iter_tables()
+
+    def save_as_json(self, output_path: str) -> int:
+        """
+        逐个表格写出 JSON 数组，内容与 json.dump(所有表格, indent=2) 完全相同，
+        但同一时间只有一个表格在内存里。返回写出的表格数（其余 save_as_* 相同）。
+        """
+        count = 0
+        with atomic_write(output_path) as f:
+            for table in self._parsed_tables():
+                # 字符串里的换行会被转义，所以 dumps 结果里的换行都是缩进用的，可以直接整体缩进一级
+                f.write(",\n  " if count else "[\n  ")
+                f.write(json.dumps(table, ensure_ascii=False, indent=2).replace("\n", "\n  "))
+                count += 1
+            f.write("\n]" if count else "[]")
+        return count
+
+    def save_as_jsonl(self, output_path: str, per_row: bool = False) -> int:
+        """
+        写出 JSON Lines：默认每个表格一行 {"table": 序号, "rows": [...]}，
+        per_row 为 True 时每个表格行一行 {"table": 序号, "row": 行号, "cells": [...]}（序号从 1 开始）。
+        """
+        idx = 0
+        with atomic_write(output_path, newline="\n") as f:
+            for idx, table in enumerate(self._parsed_tables(), start=1):
+                if per_row:
+                    for r, row in enumerate(table, start=1):
+                        f.write(json.dumps({"table": idx, "row": r, "cells": row}, ensure_ascii=False) + "\n")
+                else:
+                    f.write(json.dumps({"table": idx, "rows": table}, ensure_ascii=False) + "\n")
+        return idx
+
+    def save_as_excel(self, output_path: str) -> int:
+        """逐个表格写入只写模式的工作簿：尚未提取时边解析边写出，不在内存里保留所有表格。"""
+        idx = 0
+        with XlsxSink(output_path, title=None) as sink:
+            for idx, table in enumerate(self._parsed_tables(), start=1):
+                sink.add_sheet(f"Table{idx}")
+                sink.write_rows(table)
+        return idx
+
+    def save_as_html(self, output_path: str) -> int:
+        """逐行写出 HTML 表格，单元格文本经过转义（<、&、引号等不会破坏页面结构）。"""
+        idx = 0
+        with atomic_write(output_path) as f:
+            f.write("<html><head><meta charset='utf-8'></head><body>\n")
+            for idx, table in enumerate(self._parsed_tables(), start=1):
+                f.write(f"<h3>Table {idx}</h3>\n<table border='1' cellspacing='0' cellpadding='5'>\n")
+                for row in table:
+                    f.write("<tr>" + "".join(f"<td>{html.escape(cell)}</td>" for cell in row) + "</tr>\n")
+                f.write("</table><br>\n")
+            f.write("</body></html>")
+        return idx
+
+
+# 输出格式：界面显示名 -> (扩展名, 保存方法)
+FORMATS = {
+    "JSON": (".json", WordTableParser.save_as_json),
+    "JSON Lines (每表一行)": (".jsonl", WordTableParser.save_as_jsonl),
+    "JSON Lines (每行一行)": (".rows.jsonl", lambda parser, path: parser.save_as_jsonl(path, per_row=True)),
+    "Excel": (".xlsx", WordTableParser.save_as_excel),
+    "HTML": (".html", WordTableParser.save_as_html),
+}
+# 每种格式的扩展名都不同：批量模式按输出文件是否比源文件新判断能否跳过，两种 JSON Lines 不能共用一个输出文件
+# 命令行 --to 的取值 -> 界面显示名
+CLI_FORMATS = {"json": "JSON", "jsonl": "JSON Lines (每表一行)", "jsonl-rows": "JSON Lines (每行一行)",
+               "xlsx": "Excel", "html": "HTML"}
+
+
+# --- 命令行批量模式 ---
+def collect_batch_inputs(target):
+    """展开目录（递归）或通配符，返回 (根目录, 待转换的 .docx 列表)；跳过 Word 的 ~$ 锁文件。"""
+    path = Path(target)
+    if path.is_dir():
+        root = path
+        candidates = path.rglob("*")
+    else:
+        candidates = (Path(p) for p in glob.glob(target, recursive=True))
+        root = None
+    files = sorted(p for p in candidates
+                   if p.is_file() and p.suffix.lower() == ".docx" and not p.name.startswith("~$"))
+    if root is None:
+        root = Path(os.path.commonpath([str(p.parent) for p in files])) if files else Path(".")
+    return root, files
+
+
+def batch_output_path(input_path, root, ext, out_dir=None):
+    """计算输出路径：默认与输入同目录、只换扩展名；指定 out_dir 时按相对路径镜像到该目录。"""
+    name = input_path.with_suffix(ext).name
+    if out_dir is None:
+        return input_path.with_name(name)
+    return Path(out_dir) / input_path.parent.relative_to(root) / name
+
+
+def is_up_to_date(input_path, output_path):
+    """输出文件存在且不比源文件旧时不必重新转换。"""
+    try:
+        return output_path.stat().st_mtime >= input_path.stat().st_mtime
+    except OSError:
+        return False
+
+
+def _batch_worker(input_file, output_file, fmt):
+    """（子进程）转换一个文件，返回 (输入, 输出, 表格数, 耗时, 错误信息)。"""
+    start = time.perf_counter()
+    try:
+        Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+        tables = FORMATS[CLI_FORMATS[fmt]][1](WordTableParser(input_file), output_file)
+        return input_file, output_file, tables, time.perf_counter() - start, None
+    except Exception as e:
+        return input_file, output_file, 0, time.perf_counter() - start, str(e) or type(e).__name__
+
+
+def run_batch(target, fmt="json", out_dir=None, jobs=None, force=False):
+    """多进程批量转换，结束后打印每个文件的耗时、表格数和吞吐量汇总。返回失败文件数。"""
+    root, files = collect_batch_inputs(target)
+    if not files:
+        print(f"没有找到 .docx 文件：{target}")
+        return 0
+
+    ext = FORMATS[CLI_FORMATS[fmt]][0]
+    tasks = [(f, batch_output_path(f, root, ext, out_dir)) for f in files]
+    todo = [(f, out) for f, out in tasks if force or not is_up_to_date(f, out)]
+    skipped = len(tasks) - len(todo)
+    if skipped:
+        print(f"跳过 {skipped} 个输出已是最新的文件（--force 强制重新转换）")
+    if not todo:
+        print("全部输出都已是最新。")
+        return 0
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(todo)))
+    print(f"共 {len(todo)} 个文件，使用 {jobs} 个进程转换为 {fmt}...")
+    start = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(_batch_worker, str(f), str(out), fmt) for f, out in todo]
+        for done, future in enumerate(as_completed(futures), 1):
+            results.append(future.result())
+            print(f"\r进度：{done}/{len(todo)}", end="", flush=True)
+    elapsed = time.perf_counter() - start
+    print()
+
+    results.sort(key=lambda r: r[0])
+    failed = 0
+    total_tables = 0
+    print(f"{'耗时(秒)':>10}{'表格数':>8}  文件")
+    for input_file, output_file, tables, seconds, error in results:
+        if error:
+            failed += 1
+            print(f"{seconds:>10.3f}{'失败':>8}  {input_file}：{error}")
+        else:
+            total_tables += tables
+            print(f"{seconds:>10.3f}{tables:>8}  {input_file} -> {output_file}")
+    converted = len(results) - failed
+    elapsed = max(elapsed, 1e-9)
+    print(f"完成：成功 {converted} 个，失败 {failed} 个，跳过 {skipped} 个，共 {total_tables} 个表格，"
+          f"总耗时 {elapsed:.2f} 秒（{converted / elapsed:.1f} 个文件/秒，{total_tables / elapsed:.1f} 个表格/秒）。")
+    return failed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Word 表格转换工具：不带参数时打开图形界面，带 --batch 时在命令行批量转换。")
+    parser.add_argument("--batch", metavar="目录或通配符",
+                        help="批量转换目录（递归）或通配符匹配到的 .docx 文件，如 'handouts/**/*.docx'")
+    parser.add_argument("--to", choices=list(CLI_FORMATS), default="json",
+                        help="输出格式（默认 json；jsonl 每个表格一行，jsonl-rows 每个表格行一行，输出为 .rows.jsonl）")
+    parser.add_argument("--out-dir", help="输出到该目录并保持原有的子目录结构（默认写在输入文件旁边）")
+    parser.add_argument("--jobs", type=int, help="进程数（默认等于 CPU 核数）")
+    parser.add_argument("--force", action="store_true", help="即使输出文件比源文件新也重新转换")
+    return parser.parse_args(argv)
 
 
 # --- WordParserUI Class ---
 class WordParserUI:
     def __init__(self, root):
+        import tkinter as tk
+        from tkinter import filedialog, messagebox, ttk
+        self.tk, self.ttk, self.filedialog, self.messagebox = tk, ttk, filedialog, messagebox
         self.root = root
-        self.root.title("Word 表格转换工具 (JSON / Excel / HTML)")
+        self.root.title("Word 表格转换工具 (JSON / JSON Lines / Excel / HTML)")
         self.root.geometry("600x250")
 
         self.input_file = None
         self.output_file = None
-        self.output_format = tk.StringVar(value="JSON")
+        self.output_format = self.tk.StringVar(value="JSON")
         
-        main_frame = ttk.Frame(root, padding="15 15 15 15")
+        main_frame = self.ttk.Frame(root, padding="15 15 15 15")
         main_frame.pack(fill='both', expand=True)
         main_frame.columnconfigure(1, weight=1)
 
         # 1. 输入文件
-        ttk.Label(main_frame, text="Word 文件:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
-        self.btn_open = ttk.Button(main_frame, text="选择...", command=self.select_input, width=10)
+        self.ttk.Label(main_frame, text="Word 文件:").grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.btn_open = self.ttk.Button(main_frame, text="选择...", command=self.select_input, width=10)
         self.btn_open.grid(row=0, column=2, padx=5, pady=5)
-        self.input_path_var = tk.StringVar()
-        self.input_entry = ttk.Entry(main_frame, textvariable=self.input_path_var, state='readonly')
+        self.input_path_var = self.tk.StringVar()
+        self.input_entry = self.ttk.Entry(main_frame, textvariable=self.input_path_var, state='readonly')
         self.input_entry.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
 
         # 2. 输出格式
-        ttk.Label(main_frame, text="输出格式:").grid(row=1, column=0, padx=5, pady=10, sticky="w")
-        self.format_menu = ttk.Combobox(main_frame, textvariable=self.output_format, 
-                                        values=["JSON", "Excel", "HTML"], state="readonly", width=10)
+        self.ttk.Label(main_frame, text="输出格式:").grid(row=1, column=0, padx=5, pady=10, sticky="w")
+        self.format_menu = self.ttk.Combobox(main_frame, textvariable=self.output_format, 
+                                        values=list(FORMATS), state="readonly", width=18)
         self.format_menu.grid(row=1, column=1, padx=5, pady=10, sticky="w")
         self.format_menu.bind("<<ComboboxSelected>>", self.clear_output_path)
 
         # 3. 输出文件
-        ttk.Label(main_frame, text="保存路径:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
-        self.btn_save = ttk.Button(main_frame, text="选择...", command=self.select_output, width=10)
+        self.ttk.Label(main_frame, text="保存路径:").grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        self.btn_save = self.ttk.Button(main_frame, text="选择...", command=self.select_output, width=10)
         self.btn_save.grid(row=2, column=2, padx=5, pady=5)
-        self.output_path_var = tk.StringVar()
-        self.output_entry = ttk.Entry(main_frame, textvariable=self.output_path_var, state='readonly')
+        self.output_path_var = self.tk.StringVar()
+        self.output_entry = self.ttk.Entry(main_frame, textvariable=self.output_path_var, state='readonly')
         self.output_entry.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
 
         # 4. 执行按钮
-        self.btn_extract = ttk.Button(main_frame, text="开始转换", command=self.extract, style='Accent.TButton')
+        self.btn_extract = self.ttk.Button(main_frame, text="开始转换", command=self.extract, style='Accent.TButton')
         self.btn_extract.grid(row=3, column=0, columnspan=3, pady=20, sticky="s")
         
-        style = ttk.Style()
+        style = self.ttk.Style()
         style.theme_use('clam')
 
     def clear_output_path(self, event=None):
@@ -113,7 +316,7 @@ class WordParserUI:
         self.output_path_var.set("")
 
     def select_input(self):
-        file_path = filedialog.askopenfilename(
+        file_path = self.filedialog.askopenfilename(
             title="选择 Word 文件", 
             filetypes=[("Word 文件", "*.docx")]
         )
@@ -122,12 +325,12 @@ class WordParserUI:
             self.input_path_var.set(file_path)
 
     def select_output(self):
-        ext_map = {"JSON": ".json", "Excel": ".xlsx", "HTML": ".html"}
         fmt = self.output_format.get()
-        file_path = filedialog.asksaveasfilename(
+        ext = FORMATS[fmt][0]
+        file_path = self.filedialog.asksaveasfilename(
             title="保存文件",
-            defaultextension=ext_map[fmt],
-            filetypes=[(f"{fmt} 文件", f"*{ext_map[fmt]}")]
+            defaultextension=ext,
+            filetypes=[(f"{fmt} 文件", f"*{ext}")]
         )
         if file_path:
             self.output_file = file_path
@@ -135,34 +338,36 @@ class WordParserUI:
 
     def extract(self):
         if not self.input_file:
-            messagebox.showerror("错误", "请先选择输入的 Word 文件！")
+            self.messagebox.showerror("错误", "请先选择输入的 Word 文件！")
             return
         if not self.output_file:
-            messagebox.showerror("错误", "请先选择输出文件路径！")
+            self.messagebox.showerror("错误", "请先选择输出文件路径！")
             return
         
-        self.btn_extract.config(state=tk.DISABLED, text="正在转换...")
+        self.btn_extract.config(state=self.tk.DISABLED, text="正在转换...")
 
         try:
+            # 不预先提取全部表格：各 save_as_* 边解析边写出
             parser = WordTableParser(self.input_file)
-            parser.extract_tables()
-
             fmt = self.output_format.get()
-            if fmt == "JSON":
-                parser.save_as_json(self.output_file)
-            elif fmt == "Excel":
-                parser.save_as_excel(self.output_file)
-            elif fmt == "HTML":
-                parser.save_as_html(self.output_file)
-
-            messagebox.showinfo("成功", f"表格已转换并保存为 {fmt} 文件：\n{self.output_file}")
+            FORMATS[fmt][1](parser, self.output_file)
+
+            self.messagebox.showinfo("成功", f"表格已转换并保存为 {fmt} 文件：\n{self.output_file}")
         except Exception as e:
-            messagebox.showerror("失败", f"转换失败：\n请确保文件格式正确且未被其他程序占用。\n详细错误：{e}")
+            self.messagebox.showerror("失败", f"转换失败：\n请确保文件格式正确且未被其他程序占用。\n详细错误：{e}")
         finally:
-            self.btn_extract.config(state=tk.NORMAL, text="开始转换")
+            self.btn_extract.config(state=self.tk.NORMAL, text="开始转换")
 
 
-if __name__ == "__main__":
+def main_gui():
+    import tkinter as tk
     root = tk.Tk()
-    app = WordParserUI(root)
-    root.mainloop()
\ No newline at end of file
+    WordParserUI(root)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.batch:
+        sys.exit(1 if run_batch(args.batch, args.to, out_dir=args.out_dir, jobs=args.jobs, force=args.force) else 0)
+    main_gui()
\ No newline at end of file
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+逐行写出表格数据的输出端（提取Word表格写入到Excel.py 与 python word_table_converter_ui.py 共用）
+- XlsxSink：openpyxl 只写模式 (write_only)，行数据直接序列化，不在内存里保留整张工作簿
+- CsvSink：UTF-8 (带 BOM) CSV，csv.writer 逐行写出
+- ParquetSink：按批写入 row group，需要安装 pyarrow
+- open_sink 按输出文件的扩展名选择输出端
+- 三种输出端都先写到同目录的临时文件，完成后再原子替换，中途失败不会留下损坏或只写了一半的文件
+- atomic_write 为边解析边写出的文本输出（JSON/HTML 等）提供同样的保证
+"""
+import os
+import csv
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+# --- 配置 --- #
+PARQUET_BATCH_ROWS = 1000  # Parquet 每个 row group 的行数
+
+
+_file_mode = None
+_file_mode_lock = threading.Lock()
+
+
+def _new_file_mode():
+    """
+    普通新建文件的权限（0o666 去掉 umask）。mkstemp 创建的文件只有属主可读写，替换后的输出文件应与普通新建的文件相同。
+    第一次用到时才计算并缓存：Linux 上从 /proc/self/status 读取 umask；
+    其他系统只能先设置再恢复 os.umask，在锁内完成，且整个进程只做一次。
+    """
+    global _file_mode
+    with _file_mode_lock:
+        if _file_mode is None:
+            umask = None
+            try:
+                with open("/proc/self/status", encoding="ascii") as f:
+                    for line in f:
+                        if line.startswith("Umask:"):
+                            umask = int(line.split()[1], 8)
+                            break
+            except (OSError, ValueError):
+                pass
+            if umask is None:
+                umask = os.umask(0o022)
+                os.umask(umask)
+            _file_mode = 0o666 & ~umask
+        return _file_mode
+
+
+def _temp_path_for(path):
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=f"{path.suffix}.tmp")
+    os.close(fd)
+    os.chmod(tmp_path, _new_file_mode())
+    return Path(tmp_path)
+
+
+@contextmanager
+def atomic_write(path, encoding="utf-8", newline=None):
+    """
+    以文本方式写文件：内容先写到同目录的临时文件，正常结束后替换目标文件；
+    中途出错时删除临时文件，原来的文件保持不变。
+    """
+    path = Path(path)
+    tmp_path = _temp_path_for(path)
+    try:
+        with open(tmp_path, "w", encoding=encoding, newline=newline) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _unique_names(headers):
+    """列名去重（重复的标记名依次加 .1、.2 后缀），Parquet 要求列名唯一。"""
+    seen = {}
+    names = []
+    for name in map(str, headers):
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        names.append(name if count == 0 else f"{name}.{count}")
+    return names
+
+
+class _Sink:
+    """输出端的公共部分：上下文管理器，出错时丢弃未完成的输出。"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def write_rows(self, rows):
+        for row in rows:
+            self.write(row)
+
+
+class XlsxSink(_Sink):
+    """只写模式的 Excel 工作簿；可以有多个工作表（add_sheet）。"""
+
+    def __init__(self, path, headers=None, title="Sheet1"):
+        from openpyxl import Workbook
+        self.path = Path(path)
+        self._tmp_path = _temp_path_for(self.path)
+        self._wb = Workbook(write_only=True)
+        self._ws = None
+        self.rows = 0
+        if headers is not None or title:
+            self.add_sheet(title, headers)
+
+    def add_sheet(self, title, headers=None):
+        """新建工作表，之后写入的行都进入这个工作表。"""
+        self._ws = self._wb.create_sheet(title)
+        if headers is not None:
+            self._ws.append(list(headers))
+
+    def write(self, row):
+        self._ws.append(list(row))
+        self.rows += 1
+
+    def close(self):
+        try:
+            self._wb.save(self._tmp_path)
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self):
+        # 结束各工作表的写入流，否则 openpyxl 在回收时会打印异常
+        for ws in self._wb.worksheets:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+class CsvSink(_Sink):
+    """UTF-8 (带 BOM，Excel 可直接打开) CSV；写到临时文件，close 时替换目标文件。"""
+
+    def __init__(self, path, headers=None, title=None):
+        self.path = Path(path)
+        self._tmp_path = _temp_path_for(self.path)
+        self._file = open(self._tmp_path, "w", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file)
+        self.rows = 0
+        if headers is not None:
+            self._writer.writerow(headers)
+
+    def write(self, row):
+        self._writer.writerow(row)
+        self.rows += 1
+
+    def close(self):
+        try:
+            self._file.close()
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self):
+        # 丢弃未完成的输出，原来的文件保持不变
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+class ParquetSink(_Sink):
+    """Parquet 文件，所有列按字符串保存；需要 pyarrow。"""
+
+    def __init__(self, path, headers, title=None, batch_rows=PARQUET_BATCH_ROWS):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("输出 Parquet 需要 pyarrow，请先安装：pip install pyarrow") from None
+        self._pa = pa
+        self.path = Path(path)
+        self._tmp_path = _temp_path_for(self.path)
+        self._schema = pa.schema([(name, pa.string()) for name in _unique_names(headers)])
+        self._writer = pq.ParquetWriter(str(self._tmp_path), self._schema)
+        self._batch = []
+        self._batch_rows = batch_rows
+        self.rows = 0
+
+    def write(self, row):
+        self._batch.append(["" if v is None else str(v) for v in row])
+        self.rows += 1
+        if len(self._batch) >= self._batch_rows:
+            self._flush()
+
+    def _flush(self):
+        if not self._batch:
+            return
+        columns = list(zip(*self._batch))
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(col, type=self._pa.string()) for col in columns], schema=self._schema))
+        self._batch.clear()
+
+    def close(self):
+        try:
+            self._flush()
+            self._writer.close()
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self):
+        try:
+            self._writer.close()
+        except Exception:
+            pass
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+
+SINKS = {".xlsx": XlsxSink, ".csv": CsvSink, ".parquet": ParquetSink}
+
+
+def open_sink(path, headers, title="Sheet1"):
+    """按扩展名打开输出端（.xlsx / .csv / .parquet）。"""
+    suffix = Path(path).suffix.lower()
+    try:
+        sink_cls = SINKS[suffix]
+    except KeyError:
+        raise ValueError(f"不支持的输出格式：{suffix}（可选：{', '.join(SINKS)}）") from None
+    return sink_cls(path, headers, title=title)
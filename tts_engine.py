@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+单词发音 (TTS) 生成引擎
+- 可插拔后端：GTTSBackend 调用 Google TTS（需要联网），FakeTTSBackend 在本地伪造音频（用于压测）
+- synthesize_all 先按清理后的单词去重，再用有并发上限的线程池批量生成到共享发音缓存，并输出进度与吞吐量
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import instrumentation
+
+# --- 配置 --- #
+DEFAULT_BACKEND = "gtts"     # 默认发音后端
+DEFAULT_MAX_WORKERS = 8      # 默认最大并发数（gTTS 是网络请求，适当并发即可，过大容易被限流）
+
+# --- 发音后端 --- #
+
+class GTTSBackend:
+    """Google TTS 后端，每个单词一次网络请求。"""
+    name = "gtts"
+
+    def __init__(self, lang='en', slow=False):
+        self.lang = lang
+        self.slow = slow
+
+    def synthesize(self, text, output_path):
+        # 延迟导入：使用假后端压测时不需要安装 gTTS
+        from gtts import gTTS
+        gTTS(text=text, lang=self.lang, slow=self.slow).save(output_path)
+
+
+class FakeTTSBackend:
+    """本地假合成后端：模拟网络延迟并写出一个占位 MP3，不需要联网。"""
+    name = "fake"
+
+    def __init__(self, lang='en', slow=False, latency=0.2):
+        self.lang = lang
+        self.slow = slow
+        self.latency = latency
+
+    def synthesize(self, text, output_path):
+        if self.latency > 0:
+            time.sleep(self.latency)
+        with open(output_path, 'wb') as f:
+            f.write(b"ID3" + f"{self.lang}:{self.slow}:{text}".encode('utf-8'))
+
+
+BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    FakeTTSBackend.name: FakeTTSBackend,
+}
+
+def get_backend(name=DEFAULT_BACKEND, **kwargs):
+    """按名称创建发音后端。"""
+    try:
+        return BACKENDS[name](**kwargs)
+    except KeyError:
+        raise ValueError(f"未知的发音后端：{name}（可选：{', '.join(BACKENDS)}）") from None
+
+# --- 批量生成 --- #
+
+def dedupe_words(words):
+    """按出现顺序去重，并去掉空字符串。"""
+    return list(dict.fromkeys(w for w in words if w))
+
+def synthesize_all(words, cache, backend=None, max_workers=DEFAULT_MAX_WORKERS, progress=True):
+    """
+    并发生成一批单词的发音文件。
+
+    Args:
+        words (iterable[str]): 已清理的单词，可重复，内部会先去重。
+        cache (AudioCache): 共享发音缓存，已缓存的单词直接复用。
+        backend: 发音后端，默认 GTTSBackend。
+        max_workers (int): 最大并发数。
+        progress (bool): 是否打印进度和吞吐量。
+
+    Returns:
+        dict: 单词 -> 音频文件路径；生成失败的单词对应 None。
+    """
+    backend = backend or get_backend()
+    results = {}
+    pending = []
+    with instrumentation.span("tts.cache_lookup"):
+        for word in dedupe_words(words):
+            path = cache.get(word, backend.lang, backend.slow)
+            if path:
+                results[word] = path  # 命中缓存则直接复用
+            else:
+                pending.append(word)
+    # 只有 pending 里的单词会真正调用发音后端（每个单词一次）
+    instrumentation.count("tts.cache_hits", len(results))
+    instrumentation.count("tts.requests", len(pending))
+
+    if not pending:
+        if progress and results:
+            print(f"全部 {len(results)} 个发音已在缓存中，无需生成。")
+        cache.flush()
+        return results
+
+    total = len(pending)
+    done = 0
+    failed = 0
+    start = time.perf_counter()
+    if progress:
+        print(f"需要生成 {total} 个发音（缓存命中 {len(results)} 个），并发数 {max_workers}，后端 {backend.name}...")
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, total))) as executor:
+        futures = {executor.submit(cache.store, word, backend): word for word in pending}
+        for future in as_completed(futures):
+            word = futures[future]
+            try:
+                results[word] = future.result()
+            except Exception as e:
+                results[word] = None
+                failed += 1
+                instrumentation.count("tts.failures")
+                print(f"生成 '{word}' 的发音失败：{e}。请检查网络连接。")
+            done += 1
+            if progress:
+                elapsed = time.perf_counter() - start
+                rate = done / elapsed if elapsed > 0 else 0.0
+                print(f"\r正在生成发音：{done}/{total}（{rate:.1f} 个/秒）", end="", flush=True)
+    cache.flush()
+
+    elapsed = time.perf_counter() - start
+    if progress:
+        print()
+        print(f"发音生成完成：成功 {total - failed} 个，失败 {failed} 个，"
+              f"用时 {elapsed:.2f} 秒，吞吐量 {total / elapsed if elapsed > 0 else 0.0:.1f} 个/秒。")
+    return results
@@ -1,30 +1,82 @@
 import re
 import os
+import hashlib
+from functools import lru_cache
 
 # Default configuration
 DEFAULT_CSV_PATH = "anki_words.csv"
 
+# Precompiled cleaning patterns (applied in this order)
+_PHONETIC_RE = re.compile(r'/.*?/')          # phonetic symbols in /.../ format
+_PARENTHESES_RE = re.compile(r'\(.*\)')      # content within parentheses
+_NON_WORD_RE = re.compile(r'[^a-zA-Z0-9\s]') # other non-alphanumeric, non-space characters
+
+def file_sha1(path):
+    """
+    Compute the SHA-1 hex digest of a file, reading it in 1 MiB blocks.
+
+    Args:
+        path (str): Path of the file to hash.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
 def clean_word_for_tts(word_str):
     """
     Remove phonetic symbols and non-word characters from the word string for TTS.
-    
+
     Args:
         word_str (str): The raw word string (e.g., "apple /.../").
-        
+
     Returns:
         str: The cleaned word string suitable for text-to-speech.
     """
     if not isinstance(word_str, str):
         return ""
-    
+    return _clean_word_cached(word_str)
+
+def _clean_word(word_str):
     # Remove phonetic symbols in /.../ format
-    cleaned_word = re.sub(r'/.*?/', '', word_str)
-    
+    cleaned_word = _PHONETIC_RE.sub('', word_str)
+
     # Remove content within parentheses
-    cleaned_word = re.sub(r'\(.*\)', '', cleaned_word)
-    
+    cleaned_word = _PARENTHESES_RE.sub('', cleaned_word)
+
     # Remove other non-alphanumeric, non-space characters
     # Keeping numbers just in case, though usually words are just letters
-    cleaned_word = re.sub(r'[^a-zA-Z0-9\s]', '', cleaned_word)
-    
+    cleaned_word = _NON_WORD_RE.sub('', cleaned_word)
+
     return cleaned_word.strip()
+
+# Memoized single-word path: practice sessions and decks repeat the same words
+_clean_word_cached = lru_cache(maxsize=65536)(_clean_word)
+
+def clean_words(words):
+    """
+    Batch version of clean_word_for_tts with identical output.
+
+    Args:
+        words (pandas.Series | iterable): Raw word strings. Non-string items
+            (e.g. NaN) become "".
+
+    Returns:
+        pandas.Series | list: A Series (same index) when given a Series,
+        otherwise a list of cleaned strings in input order.
+    """
+    if hasattr(words, 'astype') and hasattr(words, 'index'):
+        # pandas Series: factorize once (hashing runs in C), clean each distinct
+        # value with the precompiled patterns, then broadcast back by code.
+        # Measured faster than chained .str.replace, which loops in Python too.
+        import numpy as np
+        import pandas as pd
+        codes, uniques = pd.factorize(words.astype(object), use_na_sentinel=True)
+        cleaned = np.array([_clean_word(w) if isinstance(w, str) else "" for w in uniques] + [""],
+                           dtype=object)
+        return pd.Series(cleaned[codes], index=words.index, name=words.name, dtype=object)
+    return [clean_word_for_tts(word) for word in words]
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+共享的单词表加载器（word_typer 与 anki_generator 共用）
+- 按列批量过滤标题行、空单词/空释义，不再用 iterrows 逐行处理
+- 固定 usecols 和 dtype=str；超大 CSV 可以用 chunksize 分块流式读取
+- 没有 Word/Meaning 表头的单元词表（如 `B3U7 ART P113.csv`）按前两列读取
+- 返回紧凑的 WordRecord 列表：(原始英文, 中文释义, 清理后的英文)
+- 解析结果编译为旁路缓存 `.<文件名>.wordcache`，CSV 未改动时直接一次性载入；
+  缓存是纯数据的 JSON（第一行为源文件信息，第二行为各列数据），载入时不会执行文件里的任何内容
+- pandas 只在需要解析 CSV 时才导入，命中缓存的启动路径完全不加载 pandas
+"""
+import os
+import json
+import tempfile
+from typing import NamedTuple
+from utils import clean_words, file_sha1, DEFAULT_CSV_PATH
+
+# --- 配置 --- #
+WORD_COLUMN = "Word"
+MEANING_COLUMN = "Meaning"
+CSV_ENCODING = "utf-8-sig"  # 兼容带 BOM 的 UTF-8
+# CSV 里混进来的标题行（包括示例文件里的全角/零宽字符写法）
+HEADER_WORDS = {"word", "英文", "英⽂", "英​文"}
+HEADER_MEANINGS = {"meaning", "中文", "中⽂", "中​文"}
+CACHE_SUFFIX = ".wordcache"
+CACHE_VERSION = 2  # 清理规则或缓存格式变化时加一，旧缓存自动失效
+MAX_HEADER_BYTES = 64 * 1024  # 缓存第一行（源文件信息）的长度上限
+
+
+class EmptyWordListError(ValueError):
+    """单词文件是空的（没有任何内容可以解析）。"""
+
+
+class WordRecord(NamedTuple):
+    english: str  # 原始英文单词，可能带音标
+    chinese: str  # 中文释义
+    clean: str    # 清理后的英文单词，用于比较和发音
+
+
+def _has_header(file_path, usecols):
+    """判断 CSV 第一行是否为 Word/Meaning 表头。"""
+    import pandas as pd
+    try:
+        columns = pd.read_csv(file_path, nrows=0, encoding=CSV_ENCODING).columns
+    except pd.errors.EmptyDataError as e:
+        raise EmptyWordListError(str(e)) from e
+    return all(col in columns for col in usecols)
+
+def _read_csv(file_path, chunksize=None):
+    """只读取单词和释义两列，全部按字符串读取；只有空单元格才视为缺失值。"""
+    import pandas as pd
+    usecols = [WORD_COLUMN, MEANING_COLUMN]
+    options = dict(encoding=CSV_ENCODING, dtype=str, keep_default_na=False, chunksize=chunksize)
+    if _has_header(file_path, usecols):
+        return pd.read_csv(file_path, usecols=usecols, **options)
+    return pd.read_csv(file_path, header=None, names=usecols, usecols=[0, 1], **options)
+
+def filter_word_frame(df):
+    """
+    按列过滤一个 Word/Meaning 数据块。
+
+    Returns:
+        (DataFrame, int): 含 english/chinese/clean 三列的有效数据，以及被跳过的空行数。
+    """
+    import pandas as pd
+    words = df[WORD_COLUMN].fillna("").astype(str).str.strip()
+    meanings = df[MEANING_COLUMN].fillna("").astype(str).str.strip()
+
+    # 过滤掉CSV中的标题行（如果它们被错误地当作数据行）
+    is_header = words.str.lower().isin(HEADER_WORDS) | meanings.str.lower().isin(HEADER_MEANINGS)
+    cleaned = clean_words(words)
+    valid = (cleaned != "") & (meanings != "")
+    keep = valid & ~is_header
+
+    frame = pd.DataFrame({
+        "english": words[keep].astype(object),
+        "chinese": meanings[keep].astype(object),
+        "clean": cleaned[keep],
+    })
+    return frame, int((~valid & ~is_header).sum())
+
+def iter_word_chunks(file_path=DEFAULT_CSV_PATH, chunksize=100_000):
+    """分块流式读取超大单词表，逐块产出 (过滤后的 DataFrame, 跳过行数)。"""
+    for chunk in _read_csv(file_path, chunksize=chunksize):
+        yield filter_word_frame(chunk)
+
+def frame_to_records(frame):
+    """把过滤后的 DataFrame 转为 WordRecord 列表。"""
+    return list(map(WordRecord._make, zip(frame["english"].tolist(),
+                                          frame["chinese"].tolist(),
+                                          frame["clean"].tolist())))
+
+# --- 编译缓存 --- #
+
+def cache_path_for(file_path):
+    """单词表对应的旁路缓存路径（与 CSV 同目录的隐藏文件）。"""
+    directory, name = os.path.split(os.path.abspath(file_path))
+    return os.path.join(directory, f".{name}{CACHE_SUFFIX}")
+
+def _source_meta(file_path, st, sha1):
+    return {"version": CACHE_VERSION, "path": os.path.abspath(file_path),
+            "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": sha1}
+
+def _write_cache(cache_path, meta, records, skipped):
+    """原子地写出缓存：先写临时文件再重命名；目录只读等情况直接放弃缓存。"""
+    columns = tuple(map(list, zip(*records))) if records else ([], [], [])
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path), suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(json.dumps(meta, ensure_ascii=False) + "\n")
+            json.dump({"columns": columns, "skipped": skipped}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+def _check_payload(payload):
+    """校验缓存数据部分的结构：三列等长的字符串列表和一个整数；不符合时返回 (None, None)。"""
+    if not isinstance(payload, dict):
+        return None, None
+    columns, skipped = payload.get("columns"), payload.get("skipped")
+    if (type(skipped) is not int or not isinstance(columns, list) or len(columns) != 3
+            or not all(isinstance(col, list) for col in columns)
+            or len({len(col) for col in columns}) != 1
+            or not all(type(v) is str for col in columns for v in col)):
+        return None, None
+    return columns, skipped
+
+def _read_cache(file_path, cache_path):
+    """
+    读取有效的缓存，返回 (records, skipped)；缓存缺失、过期或内容不完整/格式不对时返回 None。
+    先只读第一行的源文件信息：版本、路径、大小、修改时间都一致时才读取数据部分；
+    只有修改时间变化时再比对内容哈希。
+    """
+    st = os.stat(file_path)
+    try:
+        with open(cache_path, 'rb') as f:
+            meta = json.loads(f.readline(MAX_HEADER_BYTES))
+            if (not isinstance(meta, dict) or meta.get("version") != CACHE_VERSION
+                    or meta.get("path") != os.path.abspath(file_path) or meta.get("size") != st.st_size):
+                return None
+            if meta.get("mtime_ns") != st.st_mtime_ns:
+                sha1 = file_sha1(file_path)
+                if sha1 != meta.get("sha1"):
+                    return None
+            else:
+                sha1 = None
+            payload = json.loads(f.read())
+    except (OSError, ValueError):  # 读取失败、不是 JSON（含旧版缓存）或不是 UTF-8
+        return None
+    columns, skipped = _check_payload(payload)
+    if columns is None:
+        return None
+    english, chinese, clean = columns
+    records = list(map(WordRecord._make, zip(english, chinese, clean)))
+    if sha1 is not None:
+        # 内容没变、只是被 touch 过：刷新缓存里的修改时间，下次不用再算哈希
+        _write_cache(cache_path, _source_meta(file_path, st, sha1), records, skipped)
+    return records, skipped
+
+def load_word_records(file_path=DEFAULT_CSV_PATH, chunksize=None, verbose=True, use_cache=True):
+    """
+    加载单词表。
+
+    Args:
+        file_path (str): CSV 文件路径。
+        chunksize (int | None): 指定后按块流式读取，内存占用只与块大小有关。
+        verbose (bool): 是否打印被跳过的行数。
+        use_cache (bool): 是否使用/生成编译缓存；CSV 未变化时跳过解析和清理。
+
+    Returns:
+        list[WordRecord]
+
+    Raises:
+        FileNotFoundError / EmptyWordListError: 文件不存在或为空。
+    """
+    cache_path = cache_path_for(file_path)
+    cached = _read_cache(file_path, cache_path) if use_cache else None
+    if use_cache and cached is None:
+        # 解析之前记录源文件状态，解析期间文件被改动时下次会重新编译
+        meta = _source_meta(file_path, os.stat(file_path), file_sha1(file_path))
+    if cached is not None:
+        records, skipped = cached
+    elif chunksize:
+        records, skipped = [], 0
+        for frame, n_skipped in iter_word_chunks(file_path, chunksize):
+            records.extend(frame_to_records(frame))
+            skipped += n_skipped
+    else:
+        frame, skipped = filter_word_frame(_read_csv(file_path))
+        records = frame_to_records(frame)
+    if use_cache and cached is None:
+        _write_cache(cache_path, meta, records, skipped)
+    if verbose and skipped:
+        print(f"警告：跳过了 {skipped} 行空单词或空释义的数据。")
+    return records
@@ -1,71 +1,135 @@
 import os
 import random
 import time
-import pandas as pd
-from gtts import gTTS
-from playsound import playsound
+from concurrent.futures import ThreadPoolExecutor
 from utils import clean_word_for_tts, DEFAULT_CSV_PATH
+from word_loader import load_word_records, EmptyWordListError
+from tts_engine import get_backend, DEFAULT_BACKEND
+from audio_cache import AudioCache, DEFAULT_CACHE_DIR
 
 # --- 配置 --- #
 WORD_FILE_PATH = DEFAULT_CSV_PATH  # 你的单词文件路径
-AUDIO_DIR = "audio_cache"     # 存放单词发音的文件夹
+AUDIO_DIR = DEFAULT_CACHE_DIR     # 存放单词发音的文件夹（与 anki_generator 共用的发音缓存）
+TTS_BACKEND = DEFAULT_BACKEND     # 发音后端
+PREFETCH_AHEAD = 5                # 答题时在后台提前生成后面几个单词的发音
+PREFETCH_WORKERS = 4              # 后台生成发音的线程数
+WARM_WHOLE_ROUND = True           # 每轮开始时在后台为整轮单词预热发音缓存
+
+_audio_cache = None
+_tts_backend = None
 
 # --- 辅助函数 --- #
 
 def load_words(file_path):
-    """从CSV文件中加载单词列表。"""
+    """从CSV文件中加载单词列表（WordRecord 列表）。"""
     words = []
     try:
-        df = pd.read_csv(file_path)
-        for index, row in df.iterrows():
-            word = str(row['Word']).strip()
-            meaning = str(row['Meaning']).strip()
-            
-            # 过滤掉CSV中的标题行（如果它们被错误地当作数据行）
-            if word.lower() == 'word' or meaning.lower() == 'meaning':
-                continue
-            if word.lower() == '英⽂' or meaning.lower() == '中⽂': # 过滤你提供的示例中的特殊标题
-                continue
-
-            if word and meaning:
-                words.append({'english': word, 'chinese': meaning})
-            else:
-                print(f"警告：跳过空单词或空释义的行：Word='{word}', Meaning='{meaning}'")
+        words = load_word_records(file_path)
     except FileNotFoundError:
         print(f"错误：单词文件未找到，请检查路径：{file_path}")
-    except pd.errors.EmptyDataError:
+    except EmptyWordListError:
         print(f"错误：单词文件 {file_path} 是空的。")
     except Exception as e:
         print(f"加载单词时发生错误：{e}")
     return words
 
+def get_audio_cache():
+    """获取（首次调用时创建）共享发音缓存和发音后端。"""
+    global _audio_cache, _tts_backend
+    if _audio_cache is None:
+        _audio_cache = AudioCache(AUDIO_DIR)
+        _tts_backend = get_backend(TTS_BACKEND)
+    return _audio_cache, _tts_backend
+
 def get_audio_path(word):
-    """获取单词发音文件的路径。"""
-    if not os.path.exists(AUDIO_DIR):
-        os.makedirs(AUDIO_DIR)
-    # 使用清理后的单词作为文件名，避免特殊字符
-    safe_word = clean_word_for_tts(word).lower().replace(' ', '_')
-    return os.path.join(AUDIO_DIR, f"{safe_word}.mp3")
-
-def speak_word(word):
-    """生成并播放单词发音。"""
+    """获取单词发音文件在缓存中的路径（文件不一定已生成）。"""
+    cache, backend = get_audio_cache()
+    return cache.path_for(clean_word_for_tts(word), backend.lang, backend.slow)
+
+class AudioPrefetcher:
+    """后台预取发音：用户答题时，提前为后面的单词生成发音并放入缓存。"""
+
+    def __init__(self, cache, backend, max_workers=PREFETCH_WORKERS):
+        self.cache = cache
+        self.backend = backend
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.futures = {}       # 清理后的单词 -> Future
+        self.hits = 0           # 出题时发音已在缓存中的次数
+        self.misses = 0         # 出题时还需要等待生成的次数
+        self.ready_times = []   # 每题从出题到开始播放的耗时（秒）
+
+    def prefetch(self, cleaned_words):
+        """按顺序提交后台生成任务，已提交过的单词会被跳过。"""
+        for word in cleaned_words:
+            if not word:
+                continue
+            future = self.futures.get(word)
+            # 之前失败（如断网）的任务允许重新提交
+            if future is None or (future.done() and (future.cancelled() or future.exception() is not None)):
+                self.futures[word] = self.executor.submit(self.cache.get_or_create, word, self.backend)
+
+    def fetch(self, cleaned_word):
+        """取得发音文件路径（必要时等待后台任务完成），返回 (路径, 是否命中缓存)。"""
+        path = self.cache.get(cleaned_word, self.backend.lang, self.backend.slow)
+        if path:
+            return path, True
+        self.prefetch([cleaned_word])
+        return self.futures[cleaned_word].result(), False
+
+    def record(self, hit, seconds):
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.ready_times.append(seconds)
+
+    def summary(self):
+        total = self.hits + self.misses
+        if not total:
+            return "本次没有播放发音。"
+        avg = sum(self.ready_times) / total
+        return (f"发音缓存命中率：{self.hits}/{total}（{self.hits / total:.0%}），"
+                f"平均首次发音等待 {avg:.2f} 秒，最长 {max(self.ready_times):.2f} 秒。")
+
+    def shutdown(self):
+        """取消还没开始的预取，并等正在生成的发音写完，之后再写索引时它们都会被记录。"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def speak_word(word, prefetcher=None):
+    """
+    生成并播放单词发音。
+    返回 (是否命中缓存, 从调用到开始播放的秒数)；无法发音时返回 None。
+    """
     cleaned_word = clean_word_for_tts(word)
     if not cleaned_word: # 如果清理后单词为空，则不发音
-        return
+        return None
 
-    audio_file = get_audio_path(word)
-    if not os.path.exists(audio_file):
+    start = time.perf_counter()
+    if prefetcher is not None:
         try:
-            print(f"正在生成 '{cleaned_word}' 的发音...")
-            tts = gTTS(text=cleaned_word, lang='en', slow=False)
-            tts.save(audio_file)
+            audio_file, hit = prefetcher.fetch(cleaned_word)
         except Exception as e:
             print(f"生成发音失败：{e}。请检查网络连接。")
-            return
+            return None
+    else:
+        cache, backend = get_audio_cache()
+        audio_file = cache.get(cleaned_word, backend.lang, backend.slow)
+        hit = audio_file is not None
+        if audio_file is None:
+            try:
+                print(f"正在生成 '{cleaned_word}' 的发音...")
+                audio_file = cache.store(cleaned_word, backend)
+            except Exception as e:
+                print(f"生成发音失败：{e}。请检查网络连接。")
+                return None
+    ready = time.perf_counter() - start
     try:
+        from playsound import playsound  # 延迟导入：第一次发音时才加载播放器
         playsound(audio_file)
     except Exception as e:
         print(f"播放声音失败：{e}。请确保安装了playsound所需的音频播放器（如macOS上的afplay，Windows上的mpv）。")
+    return hit, ready
 
 # --- 主程序 --- #
 def main():
@@ -80,24 +144,47 @@ def main():
     print(f"成功加载 {len(words)} 个单词。")
     input("按回车键开始练习...")
 
+    cache, backend = get_audio_cache()
+    prefetcher = AudioPrefetcher(cache, backend)
+    try:
+        run_practice(words, prefetcher)
+    finally:
+        prefetcher.shutdown()
+        print(prefetcher.summary())
+
+def run_practice(words, prefetcher):
+    """练习主循环。"""
     random.shuffle(words) # 打乱单词顺序
 
     correct_count = 0
     total_attempts = 0
 
     while True:
-        for word_data in words:
+        cleaned_words = [w.clean for w in words]
+        # 先提交接下来几个单词，再在后台为整轮预热缓存（按出题顺序排队）
+        prefetcher.prefetch(cleaned_words[:PREFETCH_AHEAD + 1])
+        if WARM_WHOLE_ROUND:
+            prefetcher.prefetch(cleaned_words)
+
+        for index, word_data in enumerate(words):
             total_attempts += 1
-            english_word_raw = word_data['english'] # 原始英文单词，可能带音标
-            english_word_clean = clean_word_for_tts(english_word_raw) # 清理后的英文单词，用于比较和发音
-            chinese_meaning = word_data['chinese']
+            english_word_raw = word_data.english # 原始英文单词，可能带音标
+            english_word_clean = word_data.clean # 清理后的英文单词，用于比较和发音
+            chinese_meaning = word_data.chinese
+
+            # 用户答这一题时，后台生成后面几个单词的发音
+            prefetcher.prefetch(cleaned_words[index + 1:index + 1 + PREFETCH_AHEAD])
 
             os.system('cls' if os.name == 'nt' else 'clear') # 清屏
             print(f"\n--- 第 {total_attempts} 题 ---")
             print(f"中文意思：{chinese_meaning}")
             
             # 播放发音
-            speak_word(english_word_raw)
+            result = speak_word(english_word_raw, prefetcher)
+            if result is not None:
+                hit, ready = result
+                prefetcher.record(hit, ready)
+                print(f"（发音等待 {ready:.2f} 秒，{'缓存命中' if hit else '现场生成'}）")
 
             user_input = input("请拼写英文单词 (输入 'q' 退出，'s' 听发音，'n' 跳过): ").strip()
 
@@ -106,7 +193,7 @@ def main():
                 print(f"你一共练习了 {total_attempts-1} 个单词，正确 {correct_count} 个。")
                 return
             elif user_input.lower() == 's':
-                speak_word(english_word_raw)
+                speak_word(english_word_raw, prefetcher)
                 user_input = input("请拼写英文单词 (输入 'q' 退出，'s' 听发音，'n' 跳过): ").strip()
                 if user_input.lower() == 'q':
                     print("\n--- 练习结束 ---")
@@ -131,10 +218,15 @@ def main():
 
         print("\n--- 这一轮单词练习完成！---")
         print(f"你一共练习了 {total_attempts} 个单词，正确 {correct_count} 个。")
+        print(prefetcher.summary())
         if input("是否继续下一轮练习？(y/n): ").lower() != 'y':
             print("\n--- 练习结束 ---")
             return
         random.shuffle(words) # 重新打乱顺序
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    try:
+        main()
+    finally:
+        if _audio_cache is not None:
+            _audio_cache.flush()
\ No newline at end of file
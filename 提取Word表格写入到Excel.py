@@ -17,37 +17,40 @@
 import os
 import re
 import sys
+import time
+import argparse
 import traceback
 import webbrowser
 import threading
 import queue
+import importlib.util
+import multiprocessing
 from pathlib import Path
-from itertools import groupby
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from tkinter import ttk, messagebox, filedialog, font as tkfont, Tk, Text, Frame, Scrollbar
+from docx_tables import iter_tables
+from extract_cache import ResultCache, template_fingerprint, file_meta, DEFAULT_DB_NAME
+from table_sinks import open_sink
+import instrumentation
 
 # ----------------- 依赖检查 -----------------
-try:
-    from docx import Document
-    from openpyxl import Workbook
-except ImportError:
-    missing = []
-    try:
-        import docx
-    except ImportError:
-        missing.append("python-docx")
-    try:
-        import openpyxl
-    except ImportError:
-        missing.append("openpyxl")
-    if missing:
-        raise SystemExit(f"缺少依赖：{', '.join(missing)}\n请先执行：pip install {' '.join(missing)}")
+# 这里只检查是否已安装；python-docx / openpyxl 在真正解析或保存时才导入，窗口可以立即出现
+missing = [pkg for mod, pkg in (("docx", "python-docx"), ("openpyxl", "openpyxl"))
+           if importlib.util.find_spec(mod) is None]
+if missing:
+    raise SystemExit(f"缺少依赖：{', '.join(missing)}\n请先执行：pip install {' '.join(missing)}")
 
 # ----------------- 常量定义 -----------------
 BASE_DIR = Path(__file__).parent
 FILES_DIR = BASE_DIR / "Files"
-OUTPUT_XLSX = BASE_DIR / "汇总.xlsx"
+OUTPUT_FILE = BASE_DIR / "汇总.xlsx"  # 改为 .csv / .parquet 即可换用对应的输出格式
+CACHE_DB = BASE_DIR / DEFAULT_DB_NAME  # 提取结果缓存；删除该文件即可强制全部重新提取
 MARK_PATTERN = re.compile(r"\{\{(.+?)\}\}")  # {{标记名}}
 V_MERGE_CONTINUE = "continue"
+EXTRACT_WORKERS = None       # 并行提取的进程数，None 表示等于 CPU 核数；设为 1 则在当前线程里逐个处理
+PARALLEL_MIN_FILES = 8       # 文件数少于该值时不启动进程池（进程启动开销比解析还大）
+WATCH_INTERVAL = 2.0         # 监视模式下扫描 Files 目录的间隔（秒）
+WATCH_DEBOUNCE = 3.0         # 文件大小和修改时间保持不变多少秒后才提取（避免读到正在复制/保存的文件）
 
 # ----------------- Word 表解析核心逻辑 -----------------
 class GridCell:
@@ -60,105 +63,145 @@ class GridCell:
         self.rowspan = rowspan
         self.colspan = colspan
 
-def _get_tcPr_prop(cell, name):
-    """安全地获取单元格属性。"""
-    try:
-        return getattr(cell._tc.tcPr, name)
-    except AttributeError:
-        return None
-
-def _to_int(val, default=1):
-    """安全地将值转为整数。"""
-    try:
-        return int(str(val).strip())
-    except (ValueError, TypeError):
-        return default
+def _iter_layout_rows(table):
+    """
+    按布局网格逐行展开表格，产出每行的 [(文本, 跨列数), ...]，与 python-docx 的 row.cells 一一对应：
+    横向合并的单元格按跨列数重复出现，纵向合并 (vMerge continue) 的单元格取合并区域顶部的单元格。
+    row.cells 对每个延续单元格都要用 XPath 逐行向上查找顶部单元格，纵向合并越高越慢；
+    这里记住上一行每个网格偏移处的顶部单元格，整张表只需线性时间，合并单元格的文本也只读取一次。
+    """
+    from docx.table import _Cell
+    above = {}  # 上一行：网格偏移 -> 顶部单元格的 (文本, 跨列数)
+    for tr in table._tbl.tr_lst:
+        offset = tr.grid_before
+        cells = []
+        roots = {}
+        for tc in tr.tc_lst:
+            span = tc.grid_span
+            if tc.vMerge == V_MERGE_CONTINUE:
+                if offset not in above:
+                    # 与 row.cells 一致：上一行同一偏移处没有单元格时报错
+                    raise ValueError(f"no `tc` element at grid_offset={offset}")
+                root = above[offset]
+            else:
+                root = (_Cell(tc, table).text.replace("\n", " ").strip(), span)
+            roots[offset] = root
+            cells.extend([root] * root[1])
+            offset += span
+        above = roots
+        yield cells
 
 def build_table_grid(table):
-    """将 python-docx 的 table 对象解析为包含合并信息的逻辑网格。"""
-    # 1. 确定网格的维度（考虑横向合并）
-    col_counts = [sum(_to_int(getattr(_get_tcPr_prop(cell, "gridSpan"), "val", 1)) for cell in row.cells) for row in table.rows]
-    n_rows = len(table.rows)
-    n_cols = max(col_counts) if col_counts else 0
+    """
+    将 python-docx 的 table 对象解析为包含合并信息的逻辑网格（单次遍历，耗时与单元格数成正比）。
+    每行按 row.cells 的布局网格展开：横向合并的单元格在所跨的每一列重复出现，纵向合并的延续行
+    取合并区域顶部的文本，所以每个位置都是自己的锚点 (rowspan = colspan = 1)，模板标记的坐标
+    与 docx_tables.iter_tables 的 rows[r][c] 相同。网格宽度按各行跨列数之和的最大值计算，
+    较短的行用空白 GridCell 补齐。
+    """
+    grid = []
+    n_cols = 0
+    for r_idx, cells in enumerate(_iter_layout_rows(table)):
+        grid.append([GridCell(anchor=(r_idx, c_idx), visible=True, text=text)
+                     for c_idx, (text, _) in enumerate(cells)])
+        n_cols = max(n_cols, sum(span for _, span in cells))
+    n_rows = len(grid)
     if not n_rows or not n_cols:
         return [], 0, 0
 
-    grid = [[None for _ in range(n_cols)] for _ in range(n_rows)]
-    
-    # 2. 遍历物理单元格，填充逻辑网格
-    for r_idx, row in enumerate(table.rows):
-        c_idx = 0
-        for cell in row.cells:
-            while c_idx < n_cols and grid[r_idx][c_idx] is not None:
-                c_idx += 1
-            if c_idx >= n_cols:
-                break
-
-            # 处理横向合并
-            grid_span = _get_tcPr_prop(cell, "gridSpan")
-            colspan = _to_int(getattr(grid_span, "val", 1)) if grid_span else 1
-
-            # 处理纵向合并
-            rowspan = 1
-            v_merge = _get_tcPr_prop(cell, "vMerge")
-            is_continue = False
-            if v_merge is not None:
-                val = getattr(v_merge, "val", None)
-                if val is None or str(val).lower() == V_MERGE_CONTINUE:
-                    is_continue = True
-
-            if is_continue:
-                # 向上查找锚点并扩展其 rowspan
-                for r_scan in range(r_idx - 1, -1, -1):
-                    if grid[r_scan][c_idx] and grid[r_scan][c_idx].anchor:
-                        anchor_r, anchor_c = grid[r_scan][c_idx].anchor
-                        if grid[anchor_r][anchor_c]:
-                            grid[anchor_r][anchor_c].rowspan += 1
-                        break
-            
-            # 填充被当前单元格（及其合并）所占据的网格区域
-            text = cell.text.replace("\n", " ").strip()
-            anchor_pos = (r_idx, c_idx)
-            for i in range(rowspan):
-                for j in range(colspan):
-                    if r_idx + i < n_rows and c_idx + j < n_cols:
-                        is_anchor_cell = (i == 0 and j == 0)
-                        grid[r_idx + i][c_idx + j] = GridCell(
-                            anchor=anchor_pos,
-                            visible=is_anchor_cell,
-                            text=text if is_anchor_cell else "",
-                            rowspan=rowspan if is_anchor_cell else 1,
-                            colspan=colspan if is_anchor_cell else 1
-                        )
-            c_idx += colspan
-
-    # 3. 回填 rowspan (因为 continue 是向后看的)
-    for r in range(n_rows - 2, -1, -1):
-        for c in range(n_cols):
-            cell = grid[r][c]
-            if cell and cell.visible:
-                # 检查正下方的单元格是否是合并的延续部分
-                below_cell = grid[r + 1][c]
-                if below_cell and not below_cell.visible and below_cell.anchor == cell.anchor:
-                    # 找到合并链的底部，以确定总的 rowspan
-                    final_rowspan = 1
-                    for r_scan in range(r + 1, n_rows):
-                        scan_cell = grid[r_scan][c]
-                        if scan_cell and scan_cell.anchor == cell.anchor:
-                            final_rowspan += 1
-                        else:
-                            break
-                    cell.rowspan = final_rowspan
-
-    # 4. 填补可能因表格结构错误留下的空位
-    for r in range(n_rows):
-        for c in range(n_cols):
-            if grid[r][c] is None:
-                grid[r][c] = GridCell()
-
+    # 填补较短的行（行首/行尾缺少单元格，或横向合并让网格变宽）
+    for row in grid:
+        row.extend(GridCell() for _ in range(n_cols - len(row)))
     return grid, n_rows, n_cols
 
 # ----------------- 业务逻辑 -----------------
+def compile_marks(marks: list[dict]):
+    """把标记列表编译为 {表序: {行: {列, ...}}}，提取时按表、按行直接定位要读取的单元格。"""
+    plan = {}
+    for m in marks:
+        plan.setdefault(m["table"], {}).setdefault(m["row"], set()).add(m["col"])
+    return plan
+
+def resolve_marked_cells(rows: list[list[str]], row_plan: dict):
+    """
+    只解析标记所在的单元格，返回 {(行, 列): 文本}，结果与 build_table_grid 网格中对应锚点的文本一致；
+    表格没有任何单元格时返回 None（对应 build_table_grid 返回空网格）。
+    rows 来自 docx_tables.iter_tables，与 python-docx 的 row.cells 一样已经按布局网格展开：
+    横向合并的单元格按所跨列数重复出现，纵向合并的延续单元格取合并区域最上方的单元格，
+    所以网格坐标 (r, c) 就是 rows[r][c]，只需要读取被请求的那几个单元格。
+    """
+    if not any(rows):
+        return None
+    n_rows = len(rows)
+    texts = {}
+    for r, cols in row_plan.items():
+        cells = rows[r] if 0 <= r < n_rows else ()
+        for c in cols:
+            texts[(r, c)] = cells[c].replace("\n", " ").strip() if 0 <= c < len(cells) else ""
+    return texts
+
+def _iter_extract(files, todo, grouped_marks, marks, workers, with_meta, status_callback):
+    """解析 todo 中序号对应的文件，按完成顺序产出 (序号, (结果行, 文件状态))。"""
+    total = len(todo)
+    workers = max(1, min(workers or os.cpu_count() or 1, total))
+    if workers == 1 or total < PARALLEL_MIN_FILES:
+        for done, i in enumerate(todo, 1):
+            status_callback(f"正在处理: {done}/{total} - {files[i].name}")
+            yield i, _extract_file(files[i], grouped_marks, marks, with_meta)
+        return
+    # 用 spawn 启动子进程：调用方通常是 Tk 程序的后台线程，fork 带线程的进程不安全
+    context = multiprocessing.get_context("spawn")
+    # 启用了性能统计时，子进程里的阶段耗时随结果一起带回来
+    traced = instrumentation.enabled()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {(pool.submit(instrumentation.call_with_spans, _extract_file, files[i], grouped_marks, marks, with_meta)
+                    if traced else pool.submit(_extract_file, files[i], grouped_marks, marks, with_meta)): i
+                   for i in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            i = futures[future]
+            status_callback(f"正在处理: {done}/{total} - {files[i].name}（{workers} 个进程）")
+            yield i, instrumentation.merge_child(future.result()) if traced else future.result()
+
+def _extract_file(path: Path, grouped_marks: dict, marks: list[dict], with_meta=False):
+    """
+    从单个文件中按标记取值，返回 ([文件名, 值...], 文件状态)；可以在子进程中运行。
+    with_meta 为 True 时在解析前记录 (大小, 修改时间, 内容哈希) 供结果缓存使用；读取失败时状态为 None。
+    """
+    last_table = max(grouped_marks, default=-1)
+    resolved = {}
+    instrumentation.count("extract.files")
+    try:
+        if with_meta:
+            with instrumentation.span("extract.file_meta"):
+                meta = file_meta(path)
+        else:
+            meta = None
+        # 直接流式解析 document.xml，读到最后一个带标记的表格就停止
+        with instrumentation.span("extract.parse"):
+            for ti, rows in enumerate(iter_tables(path)):
+                if ti > last_table:
+                    break
+                instrumentation.count("extract.tables")
+                if ti in grouped_marks:
+                    resolved[ti] = resolve_marked_cells(rows, grouped_marks[ti])
+                    instrumentation.count("extract.cells", len(resolved[ti] or ()))
+    except Exception as e:
+        instrumentation.count("extract.failures")
+        print(f"无法读取文件 {path.name}: {e}")
+        return [path.stem] + [""] * len(marks), None
+
+    values = {}
+    for m in marks:
+        texts = resolved.get(m["table"])
+        if texts is None:
+            continue
+        # 清理文本中可能残留的 {{...}}
+        values[m['name']] = MARK_PATTERN.sub("", texts[(m["row"], m["col"])]).strip()
+
+    # 按原始标记顺序排列结果
+    ordered_values = [values.get(m["name"], "") for m in marks]
+    return [path.stem] + ordered_values, meta
+
 class WordExtractor:
     @staticmethod
     def collect_marks_from_template(doc_path: Path):
@@ -166,10 +209,13 @@ class WordExtractor:
         if not doc_path.is_file():
             raise FileNotFoundError(doc_path)
         
-        doc = Document(doc_path)
+        from docx import Document
+        with instrumentation.span("template.load_docx"):
+            doc = Document(doc_path)
         marks = []
         for ti, table in enumerate(doc.tables):
-            grid, n_rows, n_cols = build_table_grid(table)
+            with instrumentation.span("template.build_grid"):
+                grid, n_rows, n_cols = build_table_grid(table)
             for r in range(n_rows):
                 for c in range(n_cols):
                     gc = grid[r][c]
@@ -181,65 +227,209 @@ class WordExtractor:
         return marks
 
     @staticmethod
-    def extract_data(files: list[Path], marks: list[dict], status_callback):
-        """从文件列表中根据标记提取数据。"""
-        # 按表索引对标记进行分组，以优化性能
+    def iter_extracted_rows(files: list[Path], marks: list[dict], status_callback, workers=EXTRACT_WORKERS,
+                            cache=None):
+        """
+        从文件列表中根据标记提取数据，按 files 的原始顺序逐行产出（所有数据列都为空的行会被跳过）。
+        文件较多时分发到进程池并行解析（workers 为进程数），某个文件一完成、且它前面的文件都已产出时就立即产出，
+        调用方可以边提取边写出；每完成一个文件都会通过 status_callback 汇报进度。
+        传入 cache (ResultCache) 时只解析新增或改动过的文件，其余文件的结果直接从缓存读取。
+        """
+        # 按表索引对标记进行分组，并编译为按行定位的提取计划
         marks.sort(key=lambda m: m['table'])
-        grouped_marks = {ti: list(g) for ti, g in groupby(marks, key=lambda m: m['table'])}
-        
-        rows_out = []
-        total_files = len(files)
+        grouped_marks = compile_marks(marks)
 
-        for i, path in enumerate(files):
-            status_callback(f"正在处理: {i+1}/{total_files} - {path.name}")
-            try:
-                doc = Document(path)
-                tables = doc.tables
-            except Exception as e:
-                print(f"无法读取文件 {path.name}: {e}")
-                rows_out.append([path.stem] + [""] * len(marks))
-                continue
+        total_files = len(files)
+        ready = {}  # 已完成但还没轮到产出的行：文件序号 -> 行
+        todo = list(range(total_files))
+        if cache is not None:
+            template = template_fingerprint(marks)
+            todo = []
+            with instrumentation.span("extract.cache_lookup"):
+                for i, path in enumerate(files):
+                    row = cache.lookup(path, template)
+                    if row is None:
+                        todo.append(i)
+                    else:
+                        ready[i] = row
+            instrumentation.count("extract.cache_hits", len(ready))
+            instrumentation.count("extract.cache_misses", len(todo))
+            status_callback(f"缓存命中 {len(ready)} 个文件，需要解析 {len(todo)} 个")
+
+        next_i = 0
+
+        def drain():
+            nonlocal next_i
+            while next_i in ready:
+                row = ready.pop(next_i)
+                next_i += 1
+                # 过滤掉所有数据列都为空的行
+                if any(cell for cell in row[1:]):
+                    yield row
+
+        yield from drain()
+        for i, (row, meta) in _iter_extract(files, todo, grouped_marks, marks, workers, cache is not None,
+                                            status_callback):
+            if cache is not None and meta is not None:
+                with instrumentation.span("extract.cache_store"):
+                    cache.store(files[i], template, meta, row)
+            ready[i] = row
+            yield from drain()
+        if cache is not None:
+            cache.prune(template, files)
 
-            values = {}
-            for ti, table_marks in grouped_marks.items():
-                if ti >= len(tables):
-                    continue
-                
-                grid, n_rows, n_cols = build_table_grid(tables[ti])
-                if not grid:
-                    continue
-
-                for m in table_marks:
-                    r, c = m["row"], m["col"]
-                    val = ""
-                    if 0 <= r < n_rows and 0 <= c < n_cols:
-                        gc = grid[r][c]
-                        # 如果坐标落在被覆盖区域，取其锚点文本
-                        anchor_r, anchor_c = gc.anchor if gc.anchor else (r, c)
-                        if 0 <= anchor_r < n_rows and 0 <= anchor_c < n_cols:
-                            val = grid[anchor_r][anchor_c].text
-                    
-                    # 清理文本中可能残留的 {{...}}
-                    values[m['name']] = MARK_PATTERN.sub("", val).strip()
-
-            # 按原始标记顺序排列结果
-            ordered_values = [values.get(m["name"], "") for m in marks]
-            rows_out.append([path.stem] + ordered_values)
-
-        # 过滤掉所有数据列都为空的行
-        filtered_rows = [row for row in rows_out if any(cell for cell in row[1:])]
-        return filtered_rows
+    @staticmethod
+    @instrumentation.instrumented("extract")
+    def extract_data(files: list[Path], marks: list[dict], status_callback, workers=EXTRACT_WORKERS, cache=None):
+        """从文件列表中根据标记提取数据，一次性返回所有行（参数见 iter_extracted_rows）。"""
+        return list(WordExtractor.iter_extracted_rows(files, marks, status_callback, workers, cache))
 
     @staticmethod
-    def save_to_excel(data: list[list], headers: list[str], output_path: Path):
-        """将数据保存到 Excel 文件。"""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "提取结果"
-        ws.append(headers)
-        for row in data:
-            ws.append(row)
-        wb.save(output_path)
+    def save_to_excel(data, headers: list[str], output_path: Path):
+        """
+        将数据逐行写出到汇总文件；data 可以是生成器（如 iter_extracted_rows），边提取边写出。
+        按扩展名选择格式：.xlsx 使用 openpyxl 只写模式，.csv 为带 BOM 的 UTF-8，.parquet 需要 pyarrow；都先写临时文件，完成后再替换。
+
+        Returns:
+            int: 写出的行数。
+        """
+        sink = open_sink(output_path, headers, title="提取结果")
+        try:
+            for row in data:
+                # 只计写出本身的耗时；data 是生成器时，取下一行的时间算在提取阶段里
+                with instrumentation.span("write.summary_row"):
+                    sink.write(row)
+        except BaseException:
+            sink.abort()
+            raise
+        with instrumentation.span("write.summary_save"):
+            sink.close()
+        instrumentation.count("write.rows", sink.rows)
+        return sink.rows
+
+# ----------------- 监视模式 -----------------
+class FolderWatcher:
+    """
+    持续监视 Files 目录，汇总表随新提交的表单自动更新：
+    - 每 interval 秒扫描一次 .docx 的 (大小, 修改时间)，只用标准库轮询，各平台行为一致
+    - 新增或改动的文件在 debounce 秒内不再变化后才提取，只解析这些文件（同时写入结果缓存）
+    - 按文件更新/删除汇总中对应的行，然后整体重写汇总文件（先写临时文件再替换）
+    - 汇总表被 Excel 等程序占用导致写入失败时，下一轮扫描自动重试
+    run() 会一直阻塞到 stop() 被调用；结果缓存的连接只在 run() 所在的线程里使用。
+    """
+
+    def __init__(self, folder: Path, marks: list[dict], output_path: Path, cache_db: Path, status_callback,
+                 interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE, workers=EXTRACT_WORKERS):
+        self.folder = Path(folder)
+        self.output_path = Path(output_path)
+        self.cache_db = cache_db
+        self.status_callback = status_callback
+        self.interval = interval
+        self.debounce = debounce
+        self.workers = workers
+        # 与 iter_extracted_rows 相同：按表序排列标记
+        self.marks = sorted(marks, key=lambda m: m['table'])
+        self.headers = ["文件名"] + [m["name"] for m in self.marks]
+        self._grouped_marks = compile_marks(self.marks)
+        self._template = template_fingerprint(self.marks)
+        self._rows = {}     # 文件路径 -> 结果行
+        self._seen = {}     # 文件路径 -> 已提取时的 (大小, 修改时间)
+        self._pending = {}  # 文件路径 -> (最近一次看到的 (大小, 修改时间), 从何时起不再变化)
+        self._dirty = False
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def _scan(self):
+        """返回 {路径: (大小, 修改时间)}；跳过 Word 打开文档时生成的 ~$ 锁文件。"""
+        found = {}
+        for path in self.folder.glob("*.docx"):
+            if path.name.startswith("~$"):
+                continue
+            try:
+                st = path.stat()
+            except OSError:
+                continue  # 扫描期间被删除或移走
+            found[path] = (st.st_size, st.st_mtime_ns)
+        return found
+
+    def _extract(self, cache, paths):
+        """更新 paths 对应的行：内容没变的文件直接用缓存结果，其余文件重新解析。"""
+        todo = []
+        for path in paths:
+            row = cache.lookup(path, self._template)
+            if row is None:
+                todo.append(path)
+            else:
+                self._rows[path] = row
+        for i, (row, meta) in _iter_extract(todo, range(len(todo)), self._grouped_marks, self.marks,
+                                            self.workers, True, self.status_callback):
+            if meta is not None:
+                cache.store(todo[i], self._template, meta, row)
+            self._rows[todo[i]] = row
+        cache.commit()
+        return len(todo)
+
+    def _write_summary(self):
+        """按文件名顺序重写汇总文件（跳过所有数据列都为空的行），返回写出的行数；失败时下一轮重试。"""
+        rows = (self._rows[path] for path in sorted(self._rows))
+        try:
+            count = WordExtractor.save_to_excel((row for row in rows if any(row[1:])), self.headers,
+                                                self.output_path)
+        except OSError as e:
+            self._dirty = True
+            self.status_callback(f"写入 {self.output_path.name} 失败（文件可能正被打开），稍后重试：{e}")
+            return None
+        self._dirty = False
+        return count
+
+    def _poll(self, cache):
+        """扫描一次目录，提取已稳定的新增/改动文件并更新汇总；返回本轮是否有变化。"""
+        current = self._scan()
+        now = time.monotonic()
+        for path, stat in current.items():
+            if self._seen.get(path) == stat:
+                self._pending.pop(path, None)
+                continue
+            waiting = self._pending.get(path)
+            if waiting is None or waiting[0] != stat:
+                self._pending[path] = (stat, now)  # 新出现或仍在变化：重新开始计时
+        settled = sorted(path for path, (stat, since) in self._pending.items()
+                         if path in current and now - since >= self.debounce)
+        removed = [path for path in self._seen if path not in current]
+        for path in [path for path in self._pending if path not in current]:
+            del self._pending[path]
+        if not settled and not removed:
+            return False
+
+        for path in settled:
+            self._seen[path] = self._pending.pop(path)[0]
+        parsed = self._extract(cache, settled) if settled else 0
+        for path in removed:
+            del self._seen[path]
+            self._rows.pop(path, None)
+        if removed:
+            cache.prune(self._template, current)
+        count = self._write_summary()
+        if count is not None:
+            self.status_callback(f"{time.strftime('%H:%M:%S')} 更新 {len(settled)} 个文件（解析 {parsed} 个），"
+                                 f"移除 {len(removed)} 个，{self.output_path.name} 共 {count} 行")
+        return True
+
+    def run(self):
+        """先按当前目录内容做一次（增量）提取，然后持续监视，直到 stop() 被调用。"""
+        with ResultCache(self.cache_db) as cache:
+            self._seen = self._scan()
+            self.status_callback(f"正在提取 {self.folder.name} 中现有的 {len(self._seen)} 个文件...")
+            parsed = self._extract(cache, sorted(self._seen))
+            cache.prune(self._template, self._seen)
+            count = self._write_summary()
+            self.status_callback(f"监视中：{self.folder}（已解析 {parsed} 个文件，"
+                                 f"{self.output_path.name} 共 {count or 0} 行）")
+            while not self._stop.wait(self.interval):
+                if not self._poll(cache) and self._dirty and self._write_summary() is not None:
+                    self.status_callback(f"已重新写入 {self.output_path.name}")
 
 # ----------------- UI 界面 -----------------
 class App(Tk):
@@ -253,6 +443,7 @@ class App(Tk):
         self.marks = []
         self.extractor = WordExtractor()
         self.queue = queue.Queue()
+        self.watcher = None
 
         self._build_ui()
         self._process_queue()
@@ -285,13 +476,16 @@ class App(Tk):
         
         ttk.Button(left, text="1. 导入模板 (.docx)", command=self.on_load_template).pack(fill="x", pady=5)
         ttk.Button(left, text="2. 提取数据 (从 Files 目录)", command=self.on_extract_all).pack(fill="x", pady=5)
+        self.watch_button = ttk.Button(left, text="3. 监视 Files 目录", command=self.on_toggle_watch)
+        self.watch_button.pack(fill="x", pady=5)
         ttk.Button(left, text="打开汇总表", command=self.open_xlsx).pack(fill="x", pady=5, side="bottom")
         
         tip = ("使用说明：\n"
                "1. 点击“导入模板”，选择含 {{标记}} 的 DOCX。\n"
                "2. 右侧将列出 表序/坐标/标记。\n"
                "3. 将要处理的 .docx 文件放入 Files 目录。\n"
-               "4. 点击“提取数据”，程序将自动处理并生成\n   “汇总.xlsx”。")
+               "4. 点击“提取数据”，程序将自动处理并生成\n   “汇总.xlsx”。\n"
+               "5. 或点击“监视”，之后放入/修改的文件会\n   自动提取并更新汇总表。")
         ttk.Label(left, text=tip, justify="left", wraplength=180).pack(pady=20, fill="x")
 
         # --- 右侧 ---
@@ -321,8 +515,16 @@ class App(Tk):
             if msg == "status":
                 self.set_status(data)
             elif msg == "done":
-                self.set_status(f"提取完成！已写入：{OUTPUT_XLSX.name}")
-                messagebox.showinfo("完成", f"提取完成，共处理 {data} 个文件。\n已写入：\n{OUTPUT_XLSX}")
+                self.set_status(f"提取完成！已写入：{OUTPUT_FILE.name}")
+                messagebox.showinfo("完成", f"提取完成，共处理 {data} 个文件。\n已写入：\n{OUTPUT_FILE}")
+            elif msg == "watch_stopped":
+                self.watcher = None
+                self.watch_button.config(text="3. 监视 Files 目录")
+                if data:
+                    self.set_status("监视已停止（出现错误）")
+                    messagebox.showerror("错误", f"监视失败：\n{data}")
+                else:
+                    self.set_status("监视已停止")
             elif msg == "error":
                 self.set_status("出现错误")
                 messagebox.showerror("错误", f"处理失败：\n{data}")
@@ -367,6 +569,9 @@ class App(Tk):
         if not self.marks:
             messagebox.showinfo("提示", "请先导入包含 {{标记}} 的模板。")
             return
+        if self.watcher is not None:
+            messagebox.showinfo("提示", "正在监视 Files 目录，汇总表会自动更新。")
+            return
         
         docx_paths = list(FILES_DIR.glob("*.docx"))
         if not docx_paths:
@@ -378,38 +583,94 @@ class App(Tk):
         thread = threading.Thread(target=self._run_extraction, args=(docx_paths, self.marks), daemon=True)
         thread.start()
 
+    @instrumentation.instrumented("extract")
     def _run_extraction(self, docx_paths, marks):
         """在工作线程中执行的提取和保存逻辑。"""
         try:
             def status_callback(msg):
                 self.queue.put(("status", msg))
 
-            # 1. 提取数据
-            extracted_data = self.extractor.extract_data(docx_paths, marks, status_callback)
-            
-            # 2. 准备保存
+            # 1. 准备表头（提取结果的列按表序排列标记）
+            marks.sort(key=lambda m: m['table'])
             headers = ["文件名"] + [m["name"] for m in marks]
             
-            # 3. 保存到 Excel
-            self.queue.put(("status", f"正在保存到 {OUTPUT_XLSX.name}..."))
-            self.extractor.save_to_excel(extracted_data, headers, OUTPUT_XLSX)
+            # 2. 边提取边写出：每个文件处理完就写入汇总文件（未改动的文件直接使用缓存结果）
+            self.queue.put(("status", f"正在提取并写入 {OUTPUT_FILE.name}..."))
+            with ResultCache(CACHE_DB) as cache:
+                rows = self.extractor.iter_extracted_rows(docx_paths, marks, status_callback, cache=cache)
+                self.extractor.save_to_excel(rows, headers, OUTPUT_FILE)
             
             self.queue.put(("done", len(docx_paths)))
         except Exception as e:
             traceback.print_exc()
             self.queue.put(("error", str(e)))
 
+    def on_toggle_watch(self):
+        if self.watcher is not None:
+            self.set_status("正在停止监视...")
+            self.watcher.stop()
+            return
+        if not self.marks:
+            messagebox.showinfo("提示", "请先导入包含 {{标记}} 的模板。")
+            return
+
+        self.watcher = FolderWatcher(FILES_DIR, self.marks, OUTPUT_FILE, CACHE_DB,
+                                     lambda msg: self.queue.put(("status", msg)))
+        self.watch_button.config(text="停止监视")
+        thread = threading.Thread(target=self._run_watch, args=(self.watcher,), daemon=True)
+        thread.start()
+
+    def _run_watch(self, watcher):
+        """在工作线程中运行监视循环，结束（或出错）后通知界面。"""
+        error = None
+        try:
+            watcher.run()
+        except Exception as e:
+            traceback.print_exc()
+            error = str(e)
+        self.queue.put(("watch_stopped", error))
+
     def open_xlsx(self):
-        if not OUTPUT_XLSX.is_file():
-            messagebox.showwarning("文件不存在", f"汇总表尚未生成：\n{OUTPUT_XLSX}")
+        if not OUTPUT_FILE.is_file():
+            messagebox.showwarning("文件不存在", f"汇总表尚未生成：\n{OUTPUT_FILE}")
             return
         try:
             # 使用 webbrowser 以实现跨平台打开文件
-            webbrowser.open(OUTPUT_XLSX.as_uri())
+            webbrowser.open(OUTPUT_FILE.as_uri())
         except Exception as e:
             messagebox.showerror("打开失败", f"无法打开文件：\n{e}")
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Word 表格批量提取：不带参数时打开图形界面，带 --watch 时在命令行持续监视 Files 目录。")
+    parser.add_argument("--watch", metavar="模板.docx", type=Path,
+                        help="用该模板的 {{标记}} 持续监视 Files 目录，新增或改动的文件会自动提取并更新汇总表（Ctrl+C 退出）")
+    parser.add_argument("--interval", type=float, default=WATCH_INTERVAL,
+                        help=f"扫描间隔秒数（默认 {WATCH_INTERVAL:g}）")
+    parser.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE,
+                        help=f"文件保持不变多少秒后才提取（默认 {WATCH_DEBOUNCE:g}）")
+    return parser.parse_args(argv)
+
+def run_watch(template_path: Path, interval=WATCH_INTERVAL, debounce=WATCH_DEBOUNCE):
+    """命令行监视模式：一直运行到 Ctrl+C。"""
+    try:
+        marks = WordExtractor.collect_marks_from_template(template_path)
+    except FileNotFoundError:
+        raise SystemExit(f"找不到模板文件：{template_path}") from None
+    if not marks:
+        raise SystemExit(f"未在模板 {template_path.name} 的表格里找到 {{{{标记}}}}。")
+    FILES_DIR.mkdir(exist_ok=True)
+    print(f"模板 {template_path.name}：{len(marks)} 个标记，汇总写入 {OUTPUT_FILE}")
+    watcher = FolderWatcher(FILES_DIR, marks, OUTPUT_FILE, CACHE_DB, print, interval=interval, debounce=debounce)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("已停止监视。")
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.watch:
+        run_watch(args.watch, args.interval, args.debounce)
+        sys.exit(0)
     try:
         app = App()
         app.mainloop()